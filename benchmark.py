@@ -0,0 +1,151 @@
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from config import benchmark_filename
+import parameters as P
+import evaluation
+import ga
+import synthetic
+from evolution import ea_mu_plus_lambda
+
+# Вимірювання швидкодії на синтетичних задачах різного розміру з фіксованими
+# seed: обчислення пристосованості за секунду, тривалість покоління і пікова
+# пам'ять (tracemalloc) для кожного рушія розстановки. Результати можна
+# зберегти і порівняти з попереднім запуском, щоб помітити регресію.
+
+# "medium" за розміром близька до задачі з hours.xlsx
+SIZES = {
+    "small": dict(n_classes=12, n_teachers=24, n_subjects=15, lessons_per_class=30),
+    "medium": dict(n_classes=24, n_teachers=48, n_subjects=29, lessons_per_class=34),
+    "large": dict(n_classes=48, n_teachers=96, n_subjects=29, lessons_per_class=36),
+    "xlarge": dict(n_classes=96, n_teachers=192, n_subjects=29, lessons_per_class=38),
+}
+
+
+class GenerationTimes:
+    # Приймає ті самі виклики record, що й instrumentation.Instrumentation
+    def __init__(self):
+        self.seconds = []
+
+    def record(self, gen, nevals, **seconds):
+        if gen > 0:
+            self.seconds.append(sum(seconds.values()))
+
+
+def measure_evaluations(instance, n_genomes, repeats, seed):
+    rng = random.Random(seed)
+    genomes = [rng.sample(range(instance.n_lessons), instance.n_lessons) for _ in range(n_genomes)]
+    evaluation.init_worker(instance)
+    evaluation.evaluate_batch(genomes[:1])
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        evaluation.evaluate_batch(genomes)
+        best = min(best, time.perf_counter() - started)
+    return n_genomes / best
+
+
+def run_generations(instance, population_size, generations, seed):
+    # Послідовна еволюція з тими самими налаштуваннями, що й ga.evolve,
+    # але без контрольних точок, локального пошуку і виводу журналу
+    random.seed(seed)
+    evaluation.init_worker(instance)
+    toolbox = ga.create_toolbox(instance.n_lessons)
+    stats = ga.create_statistics()
+    ga.register_batch_evaluation(toolbox, stats, evaluation.evaluate_batch)
+    times = GenerationTimes()
+    pop = toolbox.population(n=population_size)
+    ea_mu_plus_lambda(pop, toolbox, mu=population_size, lambda_=population_size,
+                      cxpb=P.CXPB, mutpb=P.MUTPB, ngen=generations, stats=stats,
+                      verbose=False, instrumentation=times)
+    return times.seconds
+
+
+def run_benchmark(sizes, engines, n_genomes, repeats, population_size, generations, seed):
+    results = []
+    for size in sizes:
+        db, slots_structure, instance = synthetic.generate_problem(**SIZES[size], seed=seed)
+        for engine in engines:
+            P.PLACEMENT_ENGINE = engine
+            evals_per_sec = measure_evaluations(instance, n_genomes, repeats, seed)
+            seconds = sorted(run_generations(instance, population_size, generations, seed))
+            # окремий запуск з tracemalloc, бо він сповільнює виконання
+            tracemalloc.start()
+            run_generations(instance, population_size, generations, seed)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            result = {
+                "size": size,
+                "engine": engine,
+                "lessons": instance.n_lessons,
+                "evals_per_sec": evals_per_sec,
+                "generation_seconds": seconds[len(seconds) // 2],
+                "peak_memory_mb": peak / 2 ** 20,
+            }
+            print(f"{size:>8} {engine:>8} {result['lessons']:>8} {evals_per_sec:>10.1f} "
+                  f"{result['generation_seconds']:>10.3f} {result['peak_memory_mb']:>10.1f}")
+            results.append(result)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # Повертає кількість вимірювань, гірших за базові більше ніж на tolerance
+    base = {(row["size"], row["engine"]): row for row in baseline}
+    regressions = 0
+    for row in results:
+        old = base.get((row["size"], row["engine"]))
+        if old is None:
+            continue
+        checks = (
+            ("evals/s", old["evals_per_sec"], row["evals_per_sec"], row["evals_per_sec"] < old["evals_per_sec"] * (1 - tolerance)),
+            ("s/gen", old["generation_seconds"], row["generation_seconds"], row["generation_seconds"] > old["generation_seconds"] * (1 + tolerance)),
+            ("peak MB", old["peak_memory_mb"], row["peak_memory_mb"], row["peak_memory_mb"] > old["peak_memory_mb"] * (1 + tolerance)),
+        )
+        for name, before, after, worse in checks:
+            if worse:
+                print(f"REGRESSION {row['size']}/{row['engine']}: {name} {before:.3f} -> {after:.3f}")
+                regressions += 1
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the timetable decoder on synthetic problems.")
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium", "large"], choices=list(SIZES))
+    parser.add_argument("--engines", nargs="+", default=list(evaluation.BUILDERS), choices=list(evaluation.BUILDERS))
+    parser.add_argument("--genomes", type=int, default=200, help="genomes per evaluation measurement")
+    parser.add_argument("--repeats", type=int, default=3, help="evaluation measurements, the fastest is reported")
+    parser.add_argument("--population", type=int, default=60)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the problems, genomes and evolution")
+    parser.add_argument("--save", default=benchmark_filename, help="where to save the results")
+    parser.add_argument("--baseline", default=None, help="results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    print(f"{'size':>8} {'engine':>8} {'lessons':>8} {'evals/s':>10} {'s/gen':>10} {'peak MB':>10}")
+    results = run_benchmark(args.sizes, args.engines, args.genomes, args.repeats,
+                            args.population, args.generations, args.seed)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{regressions} regression(s) against {args.baseline}.")
+    else:
+        regressions = 0
+    settings = {name: getattr(args, name) for name in ("genomes", "repeats", "population", "generations", "seed")}
+    Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.save).write_text(json.dumps({"settings": settings, "results": results}, indent=1), encoding="utf-8")
+    print(f"Benchmark saved to {args.save}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
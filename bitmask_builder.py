@@ -0,0 +1,54 @@
+from builder import TimetableBuilder
+
+
+class BitmaskTimetableBuilder(TimetableBuilder):
+    # Та сама жадібна розстановка, що й у TimetableBuilder, але зайнятість
+    # класів і вчителів за тиждень зберігається у бітових масках. Позиція
+    # кодується як slot * 7 + day, тому найменший встановлений біт - це
+    # перша позиція, яку перевірив би звичайний перебір.
+    def __init__(self, individual, instance):
+        self.masks = instance.slot_masks
+        self.class_occupied = [0] * instance.n_classes
+        self.teacher_occupied = [0] * instance.n_teachers
+        super().__init__(individual, instance)
+
+    def reset(self, individual):
+        super().reset(individual)
+        self.class_occupied[:] = self._blank_classes
+        self.teacher_occupied[:] = self._blank_teachers
+
+    def snapshot(self):
+        return super().snapshot() + (self.class_occupied[:], self.teacher_occupied[:])
+
+    def restore(self, state):
+        super().restore(state[:-2])
+        self.class_occupied[:], self.teacher_occupied[:] = state[-2:]
+
+    def _try_place_lesson(self, lesson_id):
+        tables = self.tables
+        c_id = tables.lesson_class[lesson_id]
+        t_id = tables.lesson_teacher[lesson_id]
+        blocked = self.class_occupied[c_id] | self.teacher_occupied[t_id]
+        if not tables.teacher_can_offline[t_id]:
+            blocked |= self.masks.offline[c_id]
+        offline_mask = self.masks.offline[c_id]
+        # У компромісному режимі звичайні позиції вже відхилені, тож
+        # достатньо перевірити лише W-слоти
+        for tier in (self.masks.preferred[c_id], self.masks.unwanted[c_id]):
+            candidates = tier & ~blocked
+            while candidates:
+                low_bit = candidates & -candidates
+                slot, day = divmod(low_bit.bit_length() - 1, 7)
+                to_school = bool(offline_mask & low_bit)
+                if self._check_teacher_travel_constraint(t_id, day, slot, to_school):
+                    slot_type = tables.slot_types[c_id][day][slot]
+                    self._commit_lesson(lesson_id, c_id, t_id, day, slot, slot_type)
+                    return True
+                candidates ^= low_bit
+        return False
+
+    def _commit_lesson(self, lesson_id, c_id, t_id, day, slot, slot_type):
+        super()._commit_lesson(lesson_id, c_id, t_id, day, slot, slot_type)
+        pos_bit = 1 << (slot * 7 + day)
+        self.class_occupied[c_id] |= pos_bit
+        self.teacher_occupied[t_id] |= pos_bit
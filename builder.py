@@ -1,132 +1,234 @@
 import parameters as P
+import metrics
 from config import lessons_available_per_day
-from prepare import SLOT_EMPTY, SLOT_ONLINE, SLOT_OFFLINE, SLOT_TRAVEL, SLOT_UNWANTED
+from prepare import SLOT_OFFLINE, SLOT_UNWANTED
+
+# Кількість позицій (day, slot) одного класу чи вчителя за тиждень
+CELLS_PER_WEEK = 7 * lessons_available_per_day
 
 
 class TimetableBuilder:
-    def __init__(self, individual, db, slots_structure):
+    # Стан розстановки зберігається у пласких списках цілих чисел, виділених
+    # один раз; reset() готує той самий об'єкт до декодування наступної
+    # особини. Клітинка класу чи вчителя має індекс
+    # id * CELLS_PER_WEEK + day * lessons_available_per_day + slot.
+    def __init__(self, individual, instance):
+        self.instance = instance
+        self.tables = instance.lookup
+        self.candidates = instance.candidates
+        n_classes = instance.n_classes
+        n_teachers = instance.n_teachers
+        # id уроку в клітинці, -1 - порожньо
+        self._blank_class_cells = [-1] * (n_classes * CELLS_PER_WEEK)
+        self._blank_teacher_cells = [-1] * (n_teachers * CELLS_PER_WEEK)
+        self._blank_teacher_days = [0] * (n_teachers * 7)
+        self._blank_teachers = [0] * n_teachers
+        self._blank_classes = [0] * n_classes
+        self._blank_positions = [-1] * instance.n_lessons
+        self.class_lessons = self._blank_class_cells[:]
+        self.teacher_lessons = self._blank_teacher_cells[:]
+        # Бітові маски зайнятих слотів вчителя за днями (індекс t_id * 7 + day)
+        # і тих із них, які вчитель проводить з приміщення школи
+        self.teacher_day_busy = self._blank_teacher_days[:]
+        self.teacher_day_school = self._blank_teacher_days[:]
+        self.online_from_school = self._blank_teachers[:]
+        # Курсори на перший кандидат класу, який ще може бути вільним;
+        # усі позиції перед курсором уже зайняті цим класом
+        self.preferred_cursor = self._blank_classes[:]
+        self.compromise_cursor = self._blank_classes[:]
+        # lesson_position[lesson_id] = day * lessons_available_per_day + slot, -1 - не розміщено
+        self.lesson_position = self._blank_positions[:]
+        self.reset(individual)
+
+    def reset(self, individual):
         self.individual = individual
-        self.db = db
-        self.slots_structure = slots_structure
-        self.teachers_by_id = {t.id: t for t in db.teacher_dict.values()}
-        self.subjects_by_id = {s.id: s for s in db.subject_dict.values()}
-        self.schedule = {}
-        for class_obj in self.db.school_class_dict.values():
-            self.schedule[class_obj.id] = [[None] * lessons_available_per_day for _ in range(7)]
-
-        self.teacher_timeline = {}
-        for teacher_obj in self.db.teacher_dict.values():
-            self.teacher_timeline[teacher_obj.id] = [[None] * lessons_available_per_day for _ in range(7)]
-        self.teacher_online_from_school_counters = {
-            t_id: 0 for t_id in self.teachers_by_id.keys()
-        }
+        self.class_lessons[:] = self._blank_class_cells
+        self.teacher_lessons[:] = self._blank_teacher_cells
+        self.teacher_day_busy[:] = self._blank_teacher_days
+        self.teacher_day_school[:] = self._blank_teacher_days
+        self.online_from_school[:] = self._blank_teachers
+        self.preferred_cursor[:] = self._blank_classes
+        self.compromise_cursor[:] = self._blank_classes
+        self.lesson_position[:] = self._blank_positions
         self.f1_student_hardships = 0.0
         self.f2_didactic_quality = 0.0
         self.f3_teacher_comfort = 0.0
         self.unplaced_lessons_count = 0
+        self.decoded_genes = 0
+
+    @property
+    def schedule(self):
+        # Подання для експорту: {c_id: [[lesson_id або None] * слоти] * 7 днів}
+        schedule = {}
+        for c_id in self.tables.class_ids:
+            schedule[c_id] = [
+                [None if l_id == -1 else l_id for l_id in self._day_cells(self.class_lessons, c_id, day)]
+                for day in range(7)
+            ]
+        return schedule
+
+    @property
+    def teacher_timeline(self):
+        # Подання для експорту: {t_id: [[{'loc', 'lesson_id'} або None] * слоти] * 7 днів}
+        timeline = {}
+        for t_id in self.tables.teacher_ids:
+            days = []
+            for day in range(7):
+                school = self.teacher_day_school[t_id * 7 + day]
+                days.append([
+                    None if l_id == -1 else {
+                        'loc': 'SCHOOL' if (school >> slot) & 1 else 'HOME',
+                        'lesson_id': l_id
+                    }
+                    for slot, l_id in enumerate(self._day_cells(self.teacher_lessons, t_id, day))
+                ])
+            timeline[t_id] = days
+        return timeline
+
+    @staticmethod
+    def _day_cells(cells, owner_id, day):
+        start = owner_id * CELLS_PER_WEEK + day * lessons_available_per_day
+        return cells[start:start + lessons_available_per_day]
+
+    def build(self, prefix_cache=None):
+        self.place_lessons(prefix_cache)
+        if P.VECTORIZED_METRICS:
+            self._apply_vectorized_metrics()
+        else:
+            self._calculate_post_build_metrics()
+        return self.fitness()
+
+    def fitness(self):
+        return (self.f1_student_hardships, self.f2_didactic_quality, self.f3_teacher_comfort)
 
-    def build(self):
-        for lesson_id in self.individual:
-            if not self._try_place_lesson(lesson_id):
+    def add_post_build_penalties(self, f1, f2, f3):
+        self.f1_student_hardships += f1
+        self.f2_didactic_quality += f2
+        self.f3_teacher_comfort += f3
+
+    def place_lessons(self, prefix_cache=None):
+        # Жадібна розстановка без штрафів після розстановки; їх додає build()
+        # або пакетне обчислення для всієї популяції
+        start = 0
+        prefix_keys = {}
+        if prefix_cache is not None:
+            start, prefix_keys = prefix_cache.resume(self)
+        self.decoded_genes = len(self.individual) - start
+        for gene_idx in range(start, len(self.individual)):
+            if prefix_keys and gene_idx in prefix_keys and gene_idx > start:
+                prefix_cache.save(prefix_keys[gene_idx], self)
+            if not self._try_place_lesson(self.individual[gene_idx]):
                 self.unplaced_lessons_count += 1
                 self.f1_student_hardships += P.P_UNPLACED_LESSON
-        self._calculate_post_build_metrics()
-        return (self.f1_student_hardships, self.f2_didactic_quality, self.f3_teacher_comfort)
+
+    def snapshot(self):
+        return (
+            self.class_lessons[:],
+            self.teacher_lessons[:],
+            self.teacher_day_busy[:],
+            self.teacher_day_school[:],
+            self.online_from_school[:],
+            self.preferred_cursor[:],
+            self.compromise_cursor[:],
+            self.lesson_position[:],
+            (self.f1_student_hardships, self.f2_didactic_quality,
+             self.f3_teacher_comfort, self.unplaced_lessons_count),
+        )
+
+    def restore(self, state):
+        # Знімок може бути спільним для багатьох нащадків, тому лише
+        # копіюємо його у власні буфери
+        (self.class_lessons[:], self.teacher_lessons[:], self.teacher_day_busy[:],
+         self.teacher_day_school[:], self.online_from_school[:], self.preferred_cursor[:],
+         self.compromise_cursor[:], self.lesson_position[:], fitness) = state
+        (self.f1_student_hardships, self.f2_didactic_quality,
+         self.f3_teacher_comfort, self.unplaced_lessons_count) = fitness
 
     def _try_place_lesson(self, lesson_id):
-        lesson = self.db.lesson_list[lesson_id]
-        c_id = lesson.school_class_id
-        for compromise_mode in (False, True):
-            for slot_idx in range(lessons_available_per_day):
-                for day_idx in range(7):
-                    slot_type = self.slots_structure[c_id][day_idx][slot_idx]
-                    if slot_type == SLOT_UNWANTED and not compromise_mode:
-                        continue
-                    if self._can_place(lesson, day_idx, slot_idx):
-                        self._commit_lesson(lesson, day_idx, slot_idx)
-                        return True
+        c_id = self.tables.lesson_class[lesson_id]
+        t_id = self.tables.lesson_teacher[lesson_id]
+        class_lessons = self.class_lessons
+        class_base = c_id * CELLS_PER_WEEK
+        tiers = (
+            (self.candidates.preferred[c_id], self.preferred_cursor),
+            (self.candidates.compromise[c_id], self.compromise_cursor),
+        )
+        for positions, cursors in tiers:
+            start = cursors[c_id]
+            while start < len(positions) and class_lessons[class_base + positions[start][0]] != -1:
+                start += 1
+            cursors[c_id] = start
+            for idx in range(start, len(positions)):
+                pos, day_idx, slot_idx, slot_type = positions[idx]
+                if class_lessons[class_base + pos] != -1:
+                    continue
+                if self._can_place(t_id, day_idx, slot_idx, slot_type):
+                    self._commit_lesson(lesson_id, c_id, t_id, day_idx, slot_idx, slot_type)
+                    return True
         return False
 
-    def _can_place(self, lesson, day, slot):
-        c_id = lesson.school_class_id
-        t_id = lesson.teacher_id
-        if self.schedule[c_id][day][slot] is not None:
-            return False
-        slot_type = self.slots_structure[c_id][day][slot]
-        if slot_type == SLOT_EMPTY or slot_type == SLOT_TRAVEL:
+    def _can_place(self, t_id, day, slot, slot_type):
+        # Позиція береться з індексу кандидатів, тож тип слота вже придатний
+        if slot_type == SLOT_OFFLINE and not self.tables.teacher_can_offline[t_id]:
             return False
-        teacher = self.teachers_by_id[t_id]
-        if slot_type == SLOT_OFFLINE and not teacher.can_offline:
+        if (self.teacher_day_busy[t_id * 7 + day] >> slot) & 1:
             return False
-        if self.teacher_timeline[t_id][day][slot] is not None:
-            return False
-        target_loc = 'SCHOOL' if slot_type == SLOT_OFFLINE else 'HOME'
-        if not self._check_teacher_travel_constraint(teacher, day, slot, target_loc):
-            return False
-        return True
+        return self._check_teacher_travel_constraint(t_id, day, slot, slot_type == SLOT_OFFLINE)
 
-    def _check_teacher_travel_constraint(self, teacher, day, slot, target_loc):
-        timeline = self.teacher_timeline[teacher.id][day]
-        travel_needed = teacher.travel_time
-        prev_slot = slot - 1
-        while prev_slot >= 0:
-            status = timeline[prev_slot]
-            if status is not None:
-                prev_loc = status['loc']
-                if prev_loc != target_loc:
-                    is_online_from_school_case = (prev_loc == 'SCHOOL' and target_loc == 'HOME')
-                    if not is_online_from_school_case:
-                        gap = slot - prev_slot - 1
-                        if gap < travel_needed:
-                            return False
-                break
-            prev_slot -= 1
-        next_slot = slot + 1
-        while next_slot < lessons_available_per_day:
-            status = timeline[next_slot]
-            if status is not None:
-                next_loc = status['loc']
-                if next_loc != target_loc:
-                    gap = next_slot - slot - 1
-                    if gap < travel_needed:
-                        return False
-                break
-            next_slot += 1
+    def _check_teacher_travel_constraint(self, t_id, day, slot, to_school):
+        # Найближчі уроки вчителя до і після слота беремо з бітової маски дня
+        busy = self.teacher_day_busy[t_id * 7 + day]
+        if not busy:
+            return True
+        travel_needed = self.tables.teacher_travel_time[t_id]
+        school = self.teacher_day_school[t_id * 7 + day]
+        before = busy & ((1 << slot) - 1)
+        if before and to_school:
+            prev_slot = before.bit_length() - 1
+            # Переїзд потрібен лише з дому до школи; онлайн-урок після
+            # очного проводиться з приміщення школи
+            if not (school >> prev_slot) & 1 and slot - prev_slot - 1 < travel_needed:
+                return False
+        after = busy >> (slot + 1)
+        if after:
+            gap = (after & -after).bit_length() - 1
+            next_at_school = bool((school >> (slot + 1 + gap)) & 1)
+            if next_at_school != to_school and gap < travel_needed:
+                return False
         return True
 
-    def _commit_lesson(self, lesson, day, slot):
-        slot_type = self.slots_structure[lesson.school_class_id][day][slot]
-        subject = self.subjects_by_id[lesson.subject_id]
-        teacher = self.teachers_by_id[lesson.teacher_id]
-        actual_loc = 'HOME'
-        if slot_type == SLOT_OFFLINE:
-            actual_loc = 'SCHOOL'
-        else:
-            prev_slot = slot - 1
-            while prev_slot >= 0:
-                st = self.teacher_timeline[teacher.id][day][prev_slot]
-                if st:
-                    if st['loc'] == 'SCHOOL':
-                        actual_loc = 'SCHOOL'
-                    break
-                prev_slot -= 1
-        self.schedule[lesson.school_class_id][day][slot] = lesson.id
-        self.teacher_timeline[teacher.id][day][slot] = {
-            'loc': actual_loc,
-            'lesson_id': lesson.id
-        }
+    def _commit_lesson(self, lesson_id, c_id, t_id, day, slot, slot_type):
+        tables = self.tables
+        day_idx = t_id * 7 + day
+        slot_bit = 1 << slot
+        at_school = slot_type == SLOT_OFFLINE
+        if not at_school:
+            before = self.teacher_day_busy[day_idx] & (slot_bit - 1)
+            at_school = bool(before) and bool((self.teacher_day_school[day_idx] >> (before.bit_length() - 1)) & 1)
+
+        pos = day * lessons_available_per_day + slot
+        self.class_lessons[c_id * CELLS_PER_WEEK + pos] = lesson_id
+        self.teacher_lessons[t_id * CELLS_PER_WEEK + pos] = lesson_id
+        self.lesson_position[lesson_id] = pos
+        self.teacher_day_busy[day_idx] |= slot_bit
+        if at_school:
+            self.teacher_day_school[day_idx] |= slot_bit
 
         if slot_type == SLOT_UNWANTED:
             self.f1_student_hardships += P.P_UNWANTED_SLOT
 
-        if subject.priority_offline and slot_type != SLOT_OFFLINE:
+        if tables.subject_priority_offline[tables.lesson_subject[lesson_id]] and slot_type != SLOT_OFFLINE:
             self.f2_didactic_quality += P.P_SUBJECT_MISMATCH
 
-        if actual_loc == 'SCHOOL' and slot_type != SLOT_OFFLINE:
-            self.teacher_online_from_school_counters[teacher.id] += 1
-            if self.teacher_online_from_school_counters[teacher.id] > teacher.max_online_lessons_from_underground:
+        if at_school and slot_type != SLOT_OFFLINE:
+            self.online_from_school[t_id] += 1
+            if self.online_from_school[t_id] > tables.teacher_max_online_from_school[t_id]:
                 self.f3_teacher_comfort += P.P_EXCESS_ONLINE_FROM_SCHOOL
 
+    def _apply_vectorized_metrics(self):
+        class_subjects, teacher_busy = metrics.grids_from_positions(self.instance, self.lesson_position)
+        self.add_post_build_penalties(*metrics.post_build_penalties(self.instance, class_subjects, teacher_busy))
+
     def _calculate_post_build_metrics(self):
         for c_id, days in self.schedule.items():
             daily_difficulties = []
@@ -145,25 +247,25 @@ class TimetableBuilder:
                         current_stack_count = 0
                         continue
 
-                    lesson = self.db.lesson_list[l_id]
-                    subject = self.subjects_by_id[lesson.subject_id]
-                    day_subjects_counter[subject.id] = day_subjects_counter.get(subject.id, 0) + 1
-                    day_difficulty += subject.difficulty
-                    if subject.difficulty >= 7:
+                    s_id = self.tables.lesson_subject[l_id]
+                    difficulty = self.tables.subject_difficulty[s_id]
+                    day_subjects_counter[s_id] = day_subjects_counter.get(s_id, 0) + 1
+                    day_difficulty += difficulty
+                    if difficulty >= 7:
                         if idx == 0 or idx >= (lessons_available_per_day - 1):
                             self.f2_didactic_quality += P.P_DIFFICULTY_DISTRIBUTION
-                    if current_stack_subj == subject.id:
+                    if current_stack_subj == s_id:
                         current_stack_count += 1
                     else:
                         self.f2_didactic_quality += self._check_stack(current_stack_subj, current_stack_count)
-                        current_stack_subj = subject.id
+                        current_stack_subj = s_id
                         current_stack_count = 1
                 self.f2_didactic_quality += self._check_stack(current_stack_subj, current_stack_count)
                 daily_difficulties.append(day_difficulty)
                 for s_id, count in day_subjects_counter.items():
-                    subj = self.subjects_by_id[s_id]
-                    if count > subj.max_per_day:
-                        excess = count - subj.max_per_day
+                    max_per_day = self.tables.subject_max_per_day[s_id]
+                    if count > max_per_day:
+                        excess = count - max_per_day
                         self.f2_didactic_quality += excess * P.P_MAX_LESSONS_PER_DAY
             avg_mid = sum(daily_difficulties[1:4]) / 3 if sum(daily_difficulties[1:4]) > 0 else 1
             if daily_difficulties[0] > avg_mid * 1.15:
@@ -171,11 +273,11 @@ class TimetableBuilder:
             if daily_difficulties[4] > avg_mid * 1.15:
                 self.f2_didactic_quality += P.P_DIFFICULTY_DISTRIBUTION * 2
         for t_id, days in self.teacher_timeline.items():
-            teacher = self.teachers_by_id[t_id]
+            wants_windows = self.tables.teacher_wants_windows[t_id]
             for day_slots in days:
                 gaps = self._count_gaps(day_slots)
                 if gaps > 0:
-                    if not teacher.wants_windows:
+                    if not wants_windows:
                         self.f3_teacher_comfort += gaps * P.P_TEACHER_GAP
 
     def _count_gaps(self, lst):
@@ -204,10 +306,10 @@ class TimetableBuilder:
 
     def _check_stack(self, subj_id, count):
         if subj_id is None: return 0
-        subject = self.subjects_by_id[subj_id]
+        max_stack = self.tables.subject_max_stack[subj_id]
         p = 0
-        if count > subject.max_stack:
-            p += (count - subject.max_stack) * P.P_STACK_VIOLATION
-        elif count != subject.preferred_stack:
+        if count > max_stack:
+            p += (count - max_stack) * P.P_STACK_VIOLATION
+        elif count != self.tables.subject_preferred_stack[subj_id]:
             p += P.P_STACK_NON_PREFERRED
         return p
\ No newline at end of file
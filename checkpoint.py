@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import random
+import shutil
+from pathlib import Path
+
+import numpy as np
+from deap import creator, tools
+
+from instance import ProblemInstance
+
+STATE_FILENAME = "state.json"
+LOGBOOK_FILENAME = "logbook.jsonl"
+
+
+def instance_fingerprint(instance):
+    digest = hashlib.blake2b(digest_size=16)
+    for field in ProblemInstance.ARRAY_FIELDS:
+        digest.update(np.ascontiguousarray(getattr(instance, field)).tobytes())
+    return digest.hexdigest()
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _from_json(value):
+    # середні й мінімальні значення цілей у журналі зберігаються як масиви numpy
+    return np.array(value) if isinstance(value, list) else value
+
+
+class Checkpoint:
+    # Контрольна точка еволюції: популяція з пристосованостями, фронт Парето,
+    # журнал і стан генераторів випадкових чисел. Журнал лише доповнюється
+    # новими записами, масиви перезаписуються цілком (сотні кілобайт), а
+    # state.json замінюється атомарно останнім і вказує на актуальні масиви.
+    def __init__(self, directory, interval, run_config, extra=None):
+        # extra - об'єкт з get_state()/set_state() для додаткового стану
+        # (JSON-сумісного), що має пережити переривання
+        self.directory = Path(directory)
+        self.interval = interval
+        self.run_config = run_config
+        self.extra = extra
+        self._logged = 0
+
+    def __call__(self, gen, population, halloffame, logbook):
+        if self.interval > 0 and gen % self.interval == 0:
+            self.save(gen, population, halloffame, logbook)
+
+    def save(self, gen, population, halloffame, logbook):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        n_lessons = self.run_config["n_lessons"]
+        front = list(halloffame) if halloffame is not None else []
+
+        with open(self.directory / LOGBOOK_FILENAME, "a", encoding="utf-8") as f:
+            for record in logbook[self._logged:]:
+                f.write(json.dumps({key: _to_json(value) for key, value in record.items()}) + "\n")
+        self._logged = len(logbook)
+
+        # varOr додає до нащадків батьків без копіювання, тож один об'єкт може
+        # займати кілька місць у популяції; спільний fitness таких копій впливає
+        # на crowding distance у selNSGA2, тому зберігаємо і це
+        first_index = {}
+        aliases = [first_index.setdefault(id(ind), i) for i, ind in enumerate(population)]
+
+        arrays_name = f"population_{gen}.npz"
+        np.savez(
+            self.directory / arrays_name,
+            population=np.array(population, dtype=np.int32).reshape(len(population), n_lessons),
+            population_fitness=np.array([ind.fitness.values for ind in population], dtype=np.float64),
+            population_aliases=np.array(aliases, dtype=np.int32),
+            front=np.array(front, dtype=np.int32).reshape(len(front), n_lessons),
+            front_fitness=np.array([ind.fitness.values for ind in front], dtype=np.float64).reshape(len(front), -1),
+        )
+        np_state = np.random.get_state()
+        state = {
+            "gen": gen,
+            "config": self.run_config,
+            "arrays": arrays_name,
+            "logbook_records": len(logbook),
+            "random_state": random.getstate(),
+            "numpy_state": [np_state[0], np_state[1].tolist(), *np_state[2:]],
+            "extra": self.extra.get_state() if self.extra is not None else None,
+        }
+        tmp_path = self.directory / (STATE_FILENAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.directory / STATE_FILENAME)
+
+        for path in self.directory.glob("population_*.npz"):
+            if path.name != arrays_name:
+                path.unlink()
+
+    def load(self):
+        # Повертає (gen, population, front, logbook) або None, якщо продовжувати нічого.
+        # Генератори випадкових чисел відновлюються до стану на момент збереження.
+        state_path = self.directory / STATE_FILENAME
+        if not state_path.exists():
+            return None
+        try:
+            with open(state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state["config"] != self.run_config:
+                print(f"Checkpoint in {self.directory} belongs to a different run, starting from scratch.")
+                return None
+            arrays = np.load(self.directory / state["arrays"])
+            with open(self.directory / LOGBOOK_FILENAME, encoding="utf-8") as f:
+                lines = [line for _, line in zip(range(state["logbook_records"]), f)]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: checkpoint in {self.directory} is unreadable ({e}), starting from scratch.")
+            return None
+        if len(lines) != state["logbook_records"]:
+            print(f"Warning: checkpoint logbook in {self.directory} is truncated, starting from scratch.")
+            return None
+
+        population = _individuals(arrays["population"], arrays["population_fitness"])
+        population = [population[i] for i in arrays["population_aliases"].tolist()]
+        front = _individuals(arrays["front"], arrays["front_fitness"])
+        logbook = tools.Logbook()
+        for line in lines:
+            logbook.record(**{key: _from_json(value) for key, value in json.loads(line).items()})
+        # записи, дописані після останнього state.json, відкидаються
+        with open(self.directory / LOGBOOK_FILENAME, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        self._logged = len(lines)
+
+        version, internal_state, gauss_next = state["random_state"]
+        random.setstate((version, tuple(internal_state), gauss_next))
+        name, keys, pos, has_gauss, cached_gaussian = state["numpy_state"]
+        np.random.set_state((name, np.array(keys, dtype=np.uint32), pos, has_gauss, cached_gaussian))
+        if self.extra is not None and state.get("extra") is not None:
+            self.extra.set_state(state["extra"])
+        return state["gen"], population, front, logbook
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._logged = 0
+
+
+def _individuals(genomes, fitnesses):
+    individuals = []
+    for genome, fitness in zip(genomes.tolist(), fitnesses.tolist()):
+        ind = creator.Individual(genome)
+        ind.fitness.values = tuple(fitness)
+        individuals.append(ind)
+    return individuals
@@ -0,0 +1,309 @@
+import argparse
+import sys
+import time
+
+_started = time.perf_counter()
+
+from config import *
+import parameters as P
+
+# Важкі модулі (deap, matplotlib, openpyxl) імпортуються всередині команд,
+# щоб кожна команда завантажувала лише те, що їй потрібно
+
+
+def _load_problem(args):
+    from instance_cache import load_problem
+    print("--- Loading Data ---")
+    try:
+        use_cache = False if args.no_cache else None
+        db, slots_structure, instance = load_problem(args.hours, args.preferences, use_cache)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e.filename} not found! Run 'python cli.py init' first.")
+        return None
+    print(f"Loaded: {len(db.lesson_list)} lessons, {len(db.teacher_dict)} teachers, "
+          f"{len(db.school_class_dict)} classes.")
+    return db, slots_structure, instance
+
+
+def cmd_init(args):
+    import excel_parser as ep
+    from data_base import DataBase
+    db = DataBase()
+    ep.load_hours(args.hours, db)
+    ep.create_preferences_workbook(db, args.preferences)
+    return 0
+
+
+def cmd_validate(args):
+    from school_class import SchoolClass
+    from teacher import Teacher
+    problem = _load_problem(args)
+    if problem is None:
+        return 1
+    db, slots_structure, instance = problem
+    lookup = instance.lookup
+
+    errors = 0
+    class_lessons = [0] * instance.n_classes
+    for c_id in lookup.lesson_class:
+        class_lessons[c_id] += 1
+    for c_id, count in enumerate(class_lessons):
+        if count == 0:
+            continue
+        name = SchoolClass.get_by_id(c_id).name
+        preferred = len(instance.candidates.preferred[c_id])
+        compromise = len(instance.candidates.compromise[c_id])
+        if count > preferred + compromise:
+            print(f"ERROR: class {name} has {count} lessons but only {preferred + compromise} usable slots.")
+            errors += 1
+        elif count > preferred:
+            print(f"Warning: class {name} needs {count - preferred} compromise (W) slots.")
+
+    teacher_lessons = [0] * instance.n_teachers
+    for t_id in lookup.lesson_teacher:
+        teacher_lessons[t_id] += 1
+    for t_id, count in enumerate(teacher_lessons):
+        if count > 7 * lessons_available_per_day:
+            print(f"ERROR: teacher {Teacher.get_by_id(t_id).name} has {count} lessons per week.")
+            errors += 1
+
+    if errors:
+        print(f"Validation failed: {errors} error(s).")
+        return 1
+    print("Validation passed.")
+    return 0
+
+
+def cmd_solve(args):
+    import random
+    import ga
+    if args.seed is not None:
+        random.seed(args.seed)
+    problem = _load_problem(args)
+    if problem is None:
+        return 1
+    db, slots_structure, instance = problem
+    warm_front = None
+    if args.warm_start:
+        try:
+            warm_front = ga.load_front(args.warm_start)
+        except FileNotFoundError:
+            print(f"ERROR: {args.warm_start} not found!")
+            return 1
+    print(f"Startup time: {time.perf_counter() - _started:.2f} s")
+
+    pareto_front, log = _evolve(args, instance, warm_front, P.WARM_START_SHARE, resume=not args.fresh)
+    _save_results(args, db, slots_structure, instance, pareto_front, log)
+    return 0
+
+
+def _evolve(args, instance, warm_front, warm_share, resume, checkpoint_interval=P.CHECKPOINT_INTERVAL):
+    import ga
+    if args.islands > 1:
+        import islands
+        # острови обчислюють пристосованість у своїх процесах і не зберігають
+        # контрольних точок, тож ці параметри на них не впливають
+        ignored = [flag for flag, value in (("--workers", args.workers is not None),
+                                            ("--instrument", args.instrument),
+                                            ("--profile", args.profile),
+                                            ("--fresh", getattr(args, "fresh", False))) if value]
+        if ignored:
+            print(f"Warning: island mode ignores {', '.join(ignored)}.")
+        return islands.evolve_islands(instance, args.islands,
+                                      population_size=args.population,
+                                      generations=args.generations,
+                                      topology=args.topology,
+                                      time_budget=args.time_budget,
+                                      stagnation_generations=args.stagnation,
+                                      warm_front=warm_front, warm_share=warm_share)
+    parallel = P.PARALLEL_EVALUATION if args.workers is None else args.workers != 1
+    n_workers = P.N_WORKERS if args.workers is None else args.workers
+    return ga.evolve(instance,
+                     population_size=args.population,
+                     generations=args.generations,
+                     parallel=parallel, n_workers=n_workers,
+                     resume=resume,
+                     time_budget=args.time_budget,
+                     stagnation_generations=args.stagnation,
+                     instrument=args.instrument, profile=args.profile,
+                     warm_front=warm_front, warm_share=warm_share,
+                     checkpoint_interval=checkpoint_interval)
+
+
+def _save_results(args, db, slots_structure, instance, pareto_front, log, least_changed=None):
+    import ga
+    if len(pareto_front) > 0:
+        ga.save_front(pareto_front, args.front, db)
+
+    if not args.no_plots:
+        import plots
+        if len(log) > 0:
+            plots.plot_convergence(log, output_foldername+"convergence.png")
+        if len(pareto_front) > 0:
+            plots.plot_pareto_3d(pareto_front)
+            try:
+                plots.save_rotation_animation(pareto_front, output_foldername+"pareto_front.gif")
+            except Exception as e:
+                print(f"Animation failed: {e}")
+
+    if not args.no_export and len(pareto_front) > 0:
+        import export
+        import table_export
+        export.save_best_solutions(pareto_front, db, slots_structure, instance, n_workers=args.export_workers,
+                                   least_changed=least_changed)
+        table_export.save_front_table(pareto_front, db, instance, args.table)
+
+
+def cmd_repair(args):
+    import random
+    import ga
+    import repair
+    from deap import creator
+    if args.seed is not None:
+        random.seed(args.seed)
+    try:
+        previous_front = ga.load_front(args.previous)
+        previous_lessons = ga.load_front_lessons(args.previous)
+    except FileNotFoundError:
+        print(f"ERROR: {args.previous} not found! Run 'python cli.py solve' first.")
+        return 1
+    if previous_lessons is None or len(previous_front) == 0:
+        print(f"ERROR: {args.previous} has no lesson list to compare with. Run 'python cli.py solve' first.")
+        return 1
+    problem = _load_problem(args)
+    if problem is None:
+        return 1
+    db, slots_structure, instance = problem
+
+    id_map, added, removed, reassigned = repair.match_lessons(previous_lessons, repair.lesson_keys(db))
+    print(f"Lessons: {len(id_map) - reassigned} unchanged, {reassigned} with another teacher, "
+          f"{len(removed)} removed, {len(added)} added.")
+    repaired = [creator.Individual(repair.map_genome(ind, id_map, added)) for ind in previous_front]
+    print(f"Startup time: {time.perf_counter() - _started:.2f} s")
+
+    # контрольні точки вимкнено: перепланування коротке, а спільна тека
+    # контрольних точок належить перерваному запуску solve
+    pareto_front, log = _evolve(args, instance, repaired, P.REPAIR_SHARE, resume=False, checkpoint_interval=0)
+    previous_phenotypes = [ind.phenotype for ind in previous_front if getattr(ind, "phenotype", None) is not None]
+    least_changed = None
+    if previous_phenotypes and id_map and len(pareto_front) > 0:
+        from phenotype import phenotype_of
+        # наскільки кожен розв'язок відрізняється від найближчого попереднього розкладу;
+        # з однаково змінених обирається розв'язок з найменшою сумою штрафів
+        moved = [repair.moved_lessons(phenotype_of(ind, instance), previous_phenotypes, id_map)
+                 for ind in pareto_front]
+        least = min(range(len(moved)), key=lambda i: (moved[i], sum(pareto_front[i].fitness.values)))
+        least_changed = pareto_front[least]
+        print(f"Least changed: Solution {least + 1} ({moved[least]} of {len(id_map)} kept lessons moved); "
+              f"{moved.count(0)} of {len(moved)} solutions keep every kept lesson in place.")
+    _save_results(args, db, slots_structure, instance, pareto_front, log, least_changed)
+    return 0
+
+
+def cmd_export(args):
+    import ga
+    try:
+        pareto_front = ga.load_front(args.front)
+    except FileNotFoundError:
+        print(f"ERROR: {args.front} not found! Run 'python cli.py solve' first.")
+        return 1
+    problem = _load_problem(args)
+    if problem is None:
+        return 1
+    db, slots_structure, instance = problem
+    if len(pareto_front) == 0:
+        print("Pareto front is empty, nothing to export.")
+        return 1
+    saved_lessons = ga.load_front_lessons(args.front)
+    if saved_lessons is not None:
+        import repair
+        if [tuple(key) for key in saved_lessons] != repair.lesson_keys(db):
+            print(f"ERROR: the lessons have changed since {args.front} was saved. "
+                  f"Run 'python cli.py repair' to carry the front over.")
+            return 1
+    import export
+    import table_export
+    export.save_best_solutions(pareto_front, db, slots_structure, instance, n_workers=args.export_workers)
+    table_export.save_front_table(pareto_front, db, instance, args.table)
+    return 0
+
+
+def _table_filename(value):
+    # формат таблиці перевіряється до завантаження задачі й еволюції
+    from pathlib import Path
+    from table_export import FORMATS
+    if Path(value).suffix.lower() not in FORMATS:
+        raise argparse.ArgumentTypeError(f"unknown table format '{Path(value).suffix}', use {' or '.join(FORMATS)}")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="School timetable optimisation (NSGA-II).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, handler, help_text):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--hours", default=hours_filename, help="hours workbook")
+        command.add_argument("--preferences", default=preferences_filename, help="preferences workbook")
+        command.set_defaults(handler=handler)
+        return command
+
+    add_command("init", cmd_init, "create an empty preferences workbook from the hours workbook")
+
+    validate = add_command("validate", cmd_validate, "check that the problem can be scheduled")
+    validate.add_argument("--no-cache", action="store_true", help="always parse the workbooks")
+
+    def add_evolution_arguments(command, generations):
+        command.add_argument("--generations", type=int, default=generations)
+        command.add_argument("--population", type=int, default=P.POPULATION_SIZE)
+        command.add_argument("--seed", type=int, default=None, help="random seed")
+        command.add_argument("--workers", type=int, default=None,
+                             help="evaluation processes (1 - evaluate in this process, 0 - all CPUs)")
+        command.add_argument("--time-budget", type=float, default=P.TIME_BUDGET,
+                             help="stop the evolution within this many seconds (0 - no limit)")
+        command.add_argument("--stagnation", type=int, default=P.STAGNATION_GENERATIONS,
+                             help="stop after this many generations without hypervolume gain (0 - never)")
+        command.add_argument("--instrument", action="store_true", default=P.INSTRUMENTATION,
+                             help="write per-generation phase timings and builder counters to JSONL")
+        command.add_argument("--profile", action="store_true", default=P.PROFILE,
+                             help="profile the evolution with cProfile")
+        command.add_argument("--islands", type=int, default=P.ISLANDS,
+                             help="populations evolving in separate processes (island model)")
+        command.add_argument("--topology", default=P.MIGRATION_TOPOLOGY, help="migration topology: ring or complete")
+        command.add_argument("--front", default=pareto_front_filename, help="where to save the Pareto front")
+        command.add_argument("--no-plots", action="store_true", help="skip convergence plots and animation")
+        command.add_argument("--no-export", action="store_true", help="skip saving xlsx schedules")
+        command.add_argument("--export-workers", type=int, default=P.EXPORT_WORKERS,
+                             help="processes writing xlsx schedules (1 - write in this process, 0 - all CPUs)")
+        command.add_argument("--table", type=_table_filename, default=schedule_table_filename,
+                             help="one-row-per-lesson table of the whole front (.csv or .jsonl)")
+        command.add_argument("--no-cache", action="store_true", help="always parse the workbooks")
+
+    solve = add_command("solve", cmd_solve, "run the evolution and save the Pareto front")
+    add_evolution_arguments(solve, P.GENERATIONS)
+    solve.add_argument("--warm-start", default=None, metavar="FRONT",
+                       help="seed part of the initial population from a saved Pareto front")
+    solve.add_argument("--fresh", action="store_true", help="ignore an interrupted run's checkpoint")
+
+    repair = add_command("repair", cmd_repair, "carry a saved Pareto front over to changed workbooks")
+    add_evolution_arguments(repair, P.REPAIR_GENERATIONS)
+    repair.add_argument("--previous", default=pareto_front_filename, metavar="FRONT",
+                        help="Pareto front saved for the previous workbooks")
+
+    export = add_command("export", cmd_export, "save xlsx schedules for a saved Pareto front")
+    export.add_argument("--front", default=pareto_front_filename, help="saved Pareto front")
+    export.add_argument("--export-workers", type=int, default=P.EXPORT_WORKERS,
+                        help="processes writing xlsx schedules (1 - write in this process, 0 - all CPUs)")
+    export.add_argument("--table", type=_table_filename, default=schedule_table_filename,
+                        help="one-row-per-lesson table of the whole front (.csv or .jsonl)")
+    export.add_argument("--no-cache", action="store_true", help="always parse the workbooks")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,14 @@
 hours_filename = "hours.xlsx"
 preferences_filename = "preferences.xlsx"
 output_foldername = "output/"
+instance_cache_foldername = output_foldername + "cache/"
+use_instance_cache = True
+pareto_front_filename = output_foldername + "pareto_front.json"
+checkpoint_foldername = output_foldername + "checkpoint/"
+instrumentation_filename = output_foldername + "instrumentation.jsonl"
+profile_filename = output_foldername + "profile.pstats"
+benchmark_filename = output_foldername + "benchmark.json"
+schedule_table_filename = output_foldername + "schedules.csv"
 
 top_left_cell_of_day_templates = "L1"
 lessons_available_per_day = 15
@@ -0,0 +1,193 @@
+import math
+import multiprocessing
+
+import numpy as np
+
+import parameters as P
+import metrics
+from builder import TimetableBuilder
+from bitmask_builder import BitmaskTimetableBuilder
+from prefix_cache import PrefixStateCache
+from phenotype import Phenotype, PhenotypeCache
+from instrumentation import BUILDER_COUNTERS, instrumented
+
+BUILDERS = {
+    "scan": TimetableBuilder,
+    "bitmask": BitmaskTimetableBuilder,
+}
+
+# Скомпільована задача для обчислення пристосованості. У пулі процесів кожен
+# процес отримує її один раз через init_worker, а не разом з кожною особиною.
+_instance = None
+_prefix_cache = None
+# Будівник розкладу процесу; його буфери повторно використовуються для
+# кожної наступної особини замість виділення нових
+_builder = None
+# Чи рахувати роботу будівника (лічильники BUILDER_COUNTERS у stats)
+_instrumented = False
+_instrumented_builders = {}
+# Розклади обчислених особин (див. phenotype.PhenotypeCache); None - не зберігаються
+phenotypes = None
+
+
+class EvaluationStats:
+    # Лічильники обчислень поточного процесу. Дочірні процеси повертають
+    # свої лічильники разом з результатом, і головний процес їх підсумовує.
+    def __init__(self):
+        self.reset()
+
+    COUNTERS = ("genes_total", "genes_decoded") + BUILDER_COUNTERS
+
+    def reset(self):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+
+    def merge(self, other):
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def take(self):
+        taken = EvaluationStats()
+        taken.merge(self)
+        self.reset()
+        return taken
+
+    def pop_decoded_fraction(self, _values=None):
+        # Частка генів, які довелося декодувати з часу попереднього виклику;
+        # сигнатура дозволяє зареєструвати метод у tools.Statistics
+        fraction = self.genes_decoded / self.genes_total if self.genes_total else 0.0
+        self.genes_total = 0
+        self.genes_decoded = 0
+        return fraction
+
+    def pop_builder_counters(self):
+        counters = {name: getattr(self, name) for name in BUILDER_COUNTERS}
+        for name in BUILDER_COUNTERS:
+            setattr(self, name, 0)
+        return counters
+
+
+stats = EvaluationStats()
+
+
+def init_worker(instance, instrument=False):
+    global _instance, _prefix_cache, _builder, _instrumented, phenotypes
+    _instance = instance
+    _builder = None
+    _instrumented = instrument
+    _prefix_cache = None
+    phenotypes = PhenotypeCache(P.PHENOTYPE_CACHE_SIZE) if P.PHENOTYPE_CACHE_SIZE > 0 else None
+    if P.PREFIX_CACHE:
+        _prefix_cache = PrefixStateCache(P.PREFIX_CACHE_INTERVAL, P.PREFIX_CACHE_CAPACITY)
+
+
+def builder_class(engine=None, instrument=False):
+    engine = engine or P.PLACEMENT_ENGINE
+    if engine not in BUILDERS:
+        raise ValueError(f"Unknown placement engine '{engine}'. Available: {', '.join(BUILDERS)}.")
+    if not instrument:
+        return BUILDERS[engine]
+    if engine not in _instrumented_builders:
+        _instrumented_builders[engine] = instrumented(BUILDERS[engine])
+    return _instrumented_builders[engine]
+
+
+def create_builder(individual, instance, engine=None, instrument=False):
+    builder = builder_class(engine, instrument)(individual, instance)
+    if instrument:
+        builder.counters = stats
+    return builder
+
+
+def _reusable_builder(individual):
+    global _builder
+    if _builder is None or type(_builder) is not builder_class(instrument=_instrumented):
+        _builder = create_builder(individual, _instance, instrument=_instrumented)
+    else:
+        _builder.reset(individual)
+    return _builder
+
+
+def eval_genome(individual):
+    builder = _reusable_builder(individual)
+    fitness = builder.build(_prefix_cache)
+    stats.genes_total += len(individual)
+    stats.genes_decoded += builder.decoded_genes
+    if phenotypes is not None:
+        phenotypes.put(individual, Phenotype.from_builder(builder))
+    return fitness
+
+
+def evaluate_batch(genomes):
+    # Розстановка для кожної особини окремо, а штрафи після розстановки -
+    # одним векторизованим проходом для всього пакета
+    if not genomes:
+        return []
+    if not P.VECTORIZED_METRICS:
+        return [eval_genome(genome) for genome in genomes]
+    placement_fitness = []
+    positions = np.empty((len(genomes), _instance.n_lessons), dtype=np.int64)
+    for row, genome in enumerate(genomes):
+        builder = _reusable_builder(genome)
+        builder.place_lessons(_prefix_cache)
+        positions[row] = builder.lesson_position
+        placement_fitness.append(builder.fitness())
+        stats.genes_total += len(genome)
+        stats.genes_decoded += builder.decoded_genes
+        if phenotypes is not None:
+            phenotypes.put(genome, Phenotype.from_builder(builder))
+    class_subjects, teacher_busy = metrics.grids_from_positions(_instance, positions)
+    f1, f2, f3 = metrics.post_build_penalties(_instance, class_subjects, teacher_busy)
+    return [
+        (p1 + int(f1[row]), p2 + int(f2[row]), p3 + int(f3[row]))
+        for row, (p1, p2, p3) in enumerate(placement_fitness)
+    ]
+
+
+def _evaluate_chunk(genomes):
+    results = evaluate_batch(genomes)
+    return results, stats.take(), phenotypes.take() if phenotypes is not None else []
+
+
+class EvaluationPool:
+    def __init__(self, instance, n_workers=0, chunk_size=0, instrument=False):
+        processes = n_workers if n_workers > 0 else multiprocessing.cpu_count()
+        self.chunk_size = chunk_size if chunk_size > 0 else None
+        self.pool = multiprocessing.Pool(
+            processes=processes,
+            initializer=init_worker,
+            initargs=(instance, instrument)
+        )
+        self.processes = processes
+        print(f"Evaluation pool started: {processes} workers.")
+
+    def evaluate_batch(self, individuals):
+        # creator.Individual не обов'язково існує у дочірньому процесі,
+        # тому передаємо гени звичайними списками
+        genomes = [list(ind) for ind in individuals]
+        if not genomes:
+            return []
+        # Без явного розміру - приблизно по чотири пакети на процес
+        size = self.chunk_size or math.ceil(len(genomes) / (4 * self.processes))
+        chunks = [genomes[i:i + size] for i in range(0, len(genomes), size)]
+        results = []
+        for chunk_results, worker_stats, worker_phenotypes in self.pool.map(_evaluate_chunk, chunks, chunksize=1):
+            stats.merge(worker_stats)
+            if phenotypes is not None:
+                phenotypes.merge(worker_phenotypes)
+            results.extend(chunk_results)
+        return results
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.pool.terminate()
+            self.pool.join()
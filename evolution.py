@@ -0,0 +1,92 @@
+from time import perf_counter
+
+from deap import algorithms, tools
+
+
+def evaluate_invalid(individuals, toolbox):
+    invalid_ind = [ind for ind in individuals if not ind.fitness.valid]
+    fitnesses = toolbox.evaluate_batch(invalid_ind)
+    for ind, fit in zip(invalid_ind, fitnesses):
+        ind.fitness.values = fit
+    if hasattr(toolbox, "phenotype"):
+        # розклад, що дав пристосованість, переходить разом з особиною
+        # і до її копій у фронті Парето
+        for ind in invalid_ind:
+            ind.phenotype = toolbox.phenotype(ind)
+    return len(invalid_ind)
+
+
+def ea_mu_plus_lambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
+                      stats=None, halloffame=None, verbose=__debug__,
+                      logbook=None, start_gen=0, checkpoint=None, migrate=None,
+                      local_search=None, termination=None, instrumentation=None):
+    # Те саме (mu + lambda), що й algorithms.eaMuPlusLambda, але всі нові
+    # особини покоління оцінюються одним викликом toolbox.evaluate_batch.
+    # Переданий logbook означає продовження з контрольної точки: популяція
+    # вже оцінена, а покоління start_gen завершене. local_search(gen, population,
+    # halloffame) і migrate(gen, population) викликаються після відбору кожного
+    # покоління і можуть замінити частину популяції; обчислення пристосованості
+    # локальним пошуком входять до nevals. termination записує в журнал
+    # гіпероб'єм фронту і може завершити еволюцію раніше ngen поколінь.
+    # instrumentation.record отримує тривалість фаз кожного покоління.
+    if logbook is None:
+        logbook = tools.Logbook()
+        started = perf_counter()
+        nevals = evaluate_invalid(population, toolbox)
+        evaluated = perf_counter()
+        if halloffame is not None:
+            halloffame.update(population)
+        if instrumentation is not None:
+            instrumentation.record(0, nevals, evaluation=evaluated - started,
+                                   front_update=perf_counter() - evaluated)
+        record = stats.compile(population) if stats is not None else {}
+        if termination is not None:
+            record["hv"] = termination.update(0, halloffame if halloffame is not None else population)
+        logbook.record(gen=0, nevals=nevals, **record)
+    logbook.header = ['gen', 'nevals'] + (stats.fields if stats else []) + (['hv'] if termination else [])
+    if verbose:
+        print(logbook.stream)
+    if checkpoint is not None and start_gen == 0:
+        checkpoint(0, population, halloffame, logbook)
+    if termination is not None:
+        termination.start_generations()
+
+    for gen in range(start_gen + 1, ngen + 1):
+        started = perf_counter()
+        offspring = algorithms.varOr(population, toolbox, lambda_, cxpb, mutpb)
+        varied = perf_counter()
+        nevals = evaluate_invalid(offspring, toolbox)
+        evaluated = perf_counter()
+        if halloffame is not None:
+            halloffame.update(offspring)
+        front_updated = perf_counter()
+        population[:] = toolbox.select(population + offspring, mu)
+        selected = perf_counter()
+        if local_search is not None:
+            nevals += local_search(gen, population, halloffame)
+        searched = perf_counter()
+        if migrate is not None:
+            migrate(gen, population)
+        if instrumentation is not None:
+            instrumentation.record(gen, nevals,
+                                   variation=varied - started,
+                                   evaluation=evaluated - varied,
+                                   front_update=front_updated - evaluated,
+                                   selection=selected - front_updated,
+                                   local_search=searched - selected,
+                                   migration=perf_counter() - searched)
+
+        record = stats.compile(population) if stats is not None else {}
+        if termination is not None:
+            record["hv"] = termination.update(gen, halloffame if halloffame is not None else population)
+        logbook.record(gen=gen, nevals=nevals, **record)
+        if verbose:
+            print(logbook.stream)
+        if checkpoint is not None:
+            checkpoint(gen, population, halloffame, logbook)
+        if termination is not None and termination.should_stop(gen):
+            if verbose:
+                print(f"Stopping at generation {gen}: {termination.reason}.")
+            break
+
+    return population, logbook
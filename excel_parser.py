@@ -8,12 +8,13 @@ from lesson import Lesson
 from school_class import SchoolClass
 from subject import Subject
 from day import Day
+from prepare import TEACHER_COLUMNS, SUBJECT_COLUMNS
 from config import *
 
 teacher_name_pattern = r'^[А-ЯІЇЄҐа-яіїєґ]+(?:-[А-ЯІЇЄҐа-яіїєґ]+)* [А-ЯІЇЄҐ]\.[А-ЯІЇЄҐ]\.$'
 
 def get_ws_width(ws):
-    return ws.merged_cells.ranges.pop().max_col
+    return max(r.max_col for r in ws.merged_cells.ranges)
 
 def get_subtables_coords(ws):
     TABLE_MIN_COL = 1
@@ -112,6 +113,86 @@ def process_table(ws, db, starting_column=2):
                 if blink_lesson_flag:
                     db.lesson_list.append(Lesson(current_class_object.id, current_subject_object.id, current_teacher_object.id, is_blinking=True))
 
+def load_hours(filename, db, starting_column=2):
+    wb = load_workbook(filename, read_only=True, data_only=True)
+    try:
+        process_rows(wb.active.iter_rows(values_only=True), db, starting_column)
+    finally:
+        wb.close()
+
+
+def process_rows(rows, db, starting_column=2):
+    # Однопрохідний варіант process_table для read-only аркуша. Об'єднаних
+    # комірок у такому режимі немає, тому підтаблиці розпізнаються за рядком
+    # заголовка (назва предмета і хоча б один клас з першого заголовка),
+    # а закінчуються порожнім рядком. Як і в process_table, стовпці кожної
+    # підтаблиці зіставляються з класами за її власним заголовком.
+    width = None
+    class_objects = None
+    current_subject_object = None
+    skip_hours_row = False
+    unknown_classes = set()
+    skipped_loads = 0
+
+    def is_teacher(name):
+        return isinstance(name, str) and re.fullmatch(teacher_name_pattern, name)
+
+    for row in rows:
+        if width is None:
+            if len(row) > 1 and row[1] is not None:
+                width = max(idx for idx, value in enumerate(row) if value is not None) + 1
+                db.school_class_dict = {name: SchoolClass(name) for name in row[1:width]}
+            else:
+                continue
+
+        header = row[1:width]
+        if row[0] is not None and not is_teacher(row[0]) and any(name in db.school_class_dict for name in header):
+            current_subject_object = Subject(row[0])
+            db.subject_dict[row[0]] = current_subject_object
+            # як і process_table, навантаження читається зі стовпців starting_column..width-1
+            class_objects = [db.school_class_dict.get(name) for name in header[starting_column - 2:-1]]
+            unknown_classes.update(name for name in header if name is not None and name not in db.school_class_dict)
+            skip_hours_row = True
+            continue
+        if current_subject_object is None:
+            continue
+        if all(value is None for value in row):
+            current_subject_object = None
+            continue
+        if skip_hours_row:
+            skip_hours_row = False
+            continue
+
+        current_teacher_name = row[0]
+        if not is_teacher(current_teacher_name):
+            if any(value is not None for value in row[starting_column - 1:]):
+                print(f"Warning: row '{current_teacher_name}' of subject '{current_subject_object.name}' "
+                      f"is not a teacher name, its hours are skipped.")
+            continue
+        current_teacher_object = db.teacher_dict.get(current_teacher_name)
+        if current_teacher_object is None:
+            current_teacher_object = Teacher(current_teacher_name)
+            db.teacher_dict[current_teacher_name] = current_teacher_object
+
+        for current_class_object, load in zip(class_objects, row[starting_column - 1:]):
+            if load is None:
+                continue
+            if current_class_object is None:
+                skipped_loads += 1
+                continue
+            load = str(load)
+            whole_lesson_number = int(load.split(".")[0])
+            blink_lesson_flag = (load.find(".") != -1)
+            for counter in range(whole_lesson_number):
+                db.lesson_list.append(Lesson(current_class_object.id, current_subject_object.id, current_teacher_object.id))
+            if blink_lesson_flag:
+                db.lesson_list.append(Lesson(current_class_object.id, current_subject_object.id, current_teacher_object.id, is_blinking=True))
+
+    if unknown_classes:
+        print(f"Warning: classes {', '.join(sorted(map(str, unknown_classes)))} are missing from the first header, "
+              f"{skipped_loads} of their hours cells are skipped.")
+
+
 def extract_day_patterns(ws, start_cell, width, height):
     min_row, min_col = coordinate_to_tuple(start_cell)
     max_row = min_row + height - 1
@@ -150,11 +231,13 @@ def create_preferences_workbook(db, filename):
     teachers = list(db.teacher_dict.keys())
     for i, teacher_name in enumerate(teachers):
         ws_teachers.cell(row=2 + i, column=1, value=teacher_name)
-    ws_teachers["B1"] = "ПРУ"
+    for i, column_name in enumerate(TEACHER_COLUMNS):
+        ws_teachers.cell(row=1, column=2 + i, value=column_name)
     subjects = list(db.subject_dict.keys())
     for i, subject_name in enumerate(subjects):
         ws_subjects.cell(row=2 + i, column=1, value=subject_name)
-    ws_subjects["B1"] = "ПРУ"
+    for i, column_name in enumerate(SUBJECT_COLUMNS):
+        ws_subjects.cell(row=1, column=2 + i, value=column_name)
     wb.save(filename)
     print(f"Файл '{filename}' успішно створено та збережено.")
     return wb
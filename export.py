@@ -0,0 +1,302 @@
+import multiprocessing
+from pathlib import Path
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Side, Font, PatternFill, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+
+import parameters as P
+from config import *
+from prepare import SLOT_OFFLINE
+from subject import Subject
+from school_class import SchoolClass
+from phenotype import phenotype_of
+
+DAYS_NAMES = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд"]
+
+
+# збереження результату
+def save_solution(individual, filename, db, slots_structure, instance):
+    schedule = phenotype_of(individual, instance).schedule(instance)
+    wb = openpyxl.Workbook()
+    if "Sheet" in wb.sheetnames:
+        del wb["Sheet"]
+
+    thin_border = Border(left=Side(style='thin'),
+                         right=Side(style='thin'),
+                         top=Side(style='thin'),
+                         bottom=Side(style='thin'))
+
+    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    header_font = Font(bold=True)
+
+    fill_online = PatternFill(start_color="FFE699", end_color="FFE699", fill_type="solid")
+    fill_offline = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
+    fill_header = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
+
+    for c_id, days in schedule.items():
+        c_obj = SchoolClass.get_by_id(c_id)
+        sheet_title = c_obj.name[:30]
+        ws = wb.create_sheet(title=sheet_title)
+
+        days_names = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд"]
+        for i, d in enumerate(days_names):
+            cell = ws.cell(row=1, column=2 + i, value=d)
+            cell.font = header_font
+            cell.alignment = center_align
+            cell.border = thin_border
+            cell.fill = fill_header
+
+        for day_idx, lessons in enumerate(days):
+            for slot_idx, l_id in enumerate(lessons):
+                cell = ws.cell(row=2 + slot_idx, column=2 + day_idx)
+
+                num_cell = ws.cell(row=2 + slot_idx, column=1, value=slot_idx)  # Нумерація з 0
+                num_cell.alignment = center_align
+                num_cell.font = Font(size=8, color="808080")
+                num_cell.border = thin_border
+                num_cell.fill = fill_header
+
+                if l_id is not None:
+                    lesson = db.lesson_list[l_id]
+                    subj = Subject.get_by_id(lesson.subject_id)
+                    cell.value = subj.name
+
+                    slot_type = slots_structure[c_id][day_idx][slot_idx]
+
+                    if slot_type == SLOT_OFFLINE:
+                        cell.fill = fill_offline
+                    else:
+                        cell.fill = fill_online
+                else:
+                    cell.value = "-"
+                cell.alignment = center_align
+                cell.border = thin_border
+
+        ws.column_dimensions['A'].width = 4
+        for col_char in ['B', 'C', 'D', 'E', 'F', 'G', 'H']:
+            ws.column_dimensions[col_char].width = 16
+
+    wb.save(filename)
+    print(f"Saved styled schedule: {filename}")
+
+
+def save_teacher_solution(individual, filename, db, instance):
+    teacher_timeline = phenotype_of(individual, instance).teacher_timeline(instance)
+    wb = openpyxl.Workbook()
+    if "Sheet" in wb.sheetnames:
+        del wb["Sheet"]
+    thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                         top=Side(style='thin'), bottom=Side(style='thin'))
+    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    header_font = Font(bold=True)
+    fill_online = PatternFill(start_color="FFE699", end_color="FFE699", fill_type="solid")  # Home
+    fill_offline = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")  # School
+    fill_header = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
+    sorted_teachers = sorted(db.teacher_dict.values(), key=lambda t: t.name)
+
+    for teacher in sorted_teachers:
+        safe_name = teacher.name.replace(":", "").replace("/", "")[:30]
+        ws = wb.create_sheet(title=safe_name)
+        days_names = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд"]
+        for i, d in enumerate(days_names):
+            cell = ws.cell(row=1, column=2 + i, value=d)
+            cell.font = header_font
+            cell.alignment = center_align
+            cell.border = thin_border
+            cell.fill = fill_header
+        timeline = teacher_timeline[teacher.id]
+
+        for day_idx in range(7):  # 7 днів
+            for slot_idx in range(lessons_available_per_day):
+                num_cell = ws.cell(row=2 + slot_idx, column=1, value=slot_idx)  # Нумерація з 0
+                num_cell.alignment = center_align
+                num_cell.font = Font(size=8, color="808080")
+                num_cell.border = thin_border
+                num_cell.fill = fill_header
+                cell = ws.cell(row=2 + slot_idx, column=2 + day_idx)
+                entry = timeline[day_idx][slot_idx]
+
+                if entry is not None:
+                    lesson = db.lesson_list[entry['lesson_id']]
+                    subj = Subject.get_by_id(lesson.subject_id)
+                    cls_obj = SchoolClass.get_by_id(lesson.school_class_id)
+                    cell.value = f"{cls_obj.name}\n{subj.name}"
+                    if entry['loc'] == 'SCHOOL':
+                        cell.fill = fill_offline
+                    else:
+                        cell.fill = fill_online
+                else:
+                    cell.value = "-"
+
+                cell.alignment = center_align
+                cell.border = thin_border
+        ws.column_dimensions['A'].width = 4
+        for col_char in ['B', 'C', 'D', 'E', 'F', 'G', 'H']:
+            ws.column_dimensions[col_char].width = 18
+
+    wb.save(filename)
+    print(f"Saved teacher schedule: {filename}")
+
+
+# Швидкий експорт: write-only книги зі спільними іменованими стилями, рядки
+# пишуться потоком. Виглядають файли так само, як і збережені save_solution
+# та save_teacher_solution. Файли різних розв'язків пишуться паралельно, тому
+# процесам передаються лише готові розклади та назви, без реєстрів об'єктів.
+def _named_styles():
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+    def fill(color):
+        return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+    return [
+        NamedStyle("header", font=Font(bold=True), fill=fill("F2F2F2"), border=border, alignment=center_align),
+        NamedStyle("slot_number", font=Font(size=8, color="808080"), fill=fill("F2F2F2"), border=border,
+                   alignment=center_align),
+        NamedStyle("lesson_online", font=DEFAULT_FONT, fill=fill("FFE699"), border=border, alignment=center_align),
+        NamedStyle("lesson_offline", font=DEFAULT_FONT, fill=fill("DDEBF7"), border=border, alignment=center_align),
+        NamedStyle("no_lesson", font=DEFAULT_FONT, border=border, alignment=center_align),
+    ]
+
+
+def _write_only_workbook():
+    wb = openpyxl.Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+    return wb
+
+
+def _styled(ws, value, style):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def _append_sheet(wb, title, column_width, cells):
+    # cells(day_idx, slot_idx) повертає (значення, стиль) або None для "-"
+    ws = wb.create_sheet(title=title)
+    ws.column_dimensions['A'].width = 4
+    for col_char in ['B', 'C', 'D', 'E', 'F', 'G', 'H']:
+        ws.column_dimensions[col_char].width = column_width
+    ws.append([None] + [_styled(ws, d, "header") for d in DAYS_NAMES])
+    for slot_idx in range(lessons_available_per_day):
+        row = [_styled(ws, slot_idx, "slot_number")]  # Нумерація з 0
+        for day_idx in range(7):
+            entry = cells(day_idx, slot_idx)
+            row.append(_styled(ws, "-", "no_lesson") if entry is None else _styled(ws, *entry))
+        ws.append(row)
+
+
+def export_names(db):
+    # Назви, потрібні швидкому експорту, у вигляді, що передається процесам
+    return {
+        "classes": {c.id: c.name for c in db.school_class_dict.values()},
+        "subjects": {s.id: s.name for s in db.subject_dict.values()},
+        "teachers": [(t.id, t.name) for t in sorted(db.teacher_dict.values(), key=lambda t: t.name)],
+        "lessons": [(lesson.school_class_id, lesson.subject_id) for lesson in db.lesson_list],
+    }
+
+
+def write_solution(schedule, filename, names, slots_structure):
+    wb = _write_only_workbook()
+    lessons = names["lessons"]
+    subjects = names["subjects"]
+    for c_id, days in schedule.items():
+        class_slots = slots_structure[c_id]
+
+        def cells(day_idx, slot_idx):
+            l_id = days[day_idx][slot_idx]
+            if l_id is None:
+                return None
+            offline = class_slots[day_idx][slot_idx] == SLOT_OFFLINE
+            return subjects[lessons[l_id][1]], "lesson_offline" if offline else "lesson_online"
+
+        _append_sheet(wb, names["classes"][c_id][:30], 16, cells)
+    wb.save(filename)
+
+
+def write_teacher_solution(teacher_timeline, filename, names):
+    wb = _write_only_workbook()
+    lessons = names["lessons"]
+    for t_id, name in names["teachers"]:
+        timeline = teacher_timeline[t_id]
+
+        def cells(day_idx, slot_idx):
+            entry = timeline[day_idx][slot_idx]
+            if entry is None:
+                return None
+            c_id, s_id = lessons[entry['lesson_id']]
+            style = "lesson_offline" if entry['loc'] == 'SCHOOL' else "lesson_online"
+            return f"{names['classes'][c_id]}\n{names['subjects'][s_id]}", style
+
+        _append_sheet(wb, name.replace(":", "").replace("/", "")[:30], 18, cells)
+    wb.save(filename)
+
+
+def _write_job(job):
+    write, args = job
+    write(*args)
+
+
+def save_best_solutions(pareto_front, db, slots_structure, instance, folder=output_foldername,
+                        fast=P.FAST_EXPORT, n_workers=P.EXPORT_WORKERS, least_changed=None):
+    # least_changed - розв'язок перепланування, найближчий до попереднього розкладу
+    Path(folder).mkdir(parents=True, exist_ok=True)
+    print("\n--- Saving Best Solutions ---")
+    jobs = []
+    pairs = []
+    names = export_names(db) if fast else None
+
+    def save_pair(ind, name_suffix):
+        f_student = folder+f"schedule_{name_suffix}.xlsx"
+        f_teacher = folder+f"teachers_{name_suffix}.xlsx"
+        if fast:
+            phenotype = phenotype_of(ind, instance)
+            jobs.append((write_solution, (phenotype.schedule(instance), f_student, names, slots_structure)))
+            jobs.append((write_teacher_solution, (phenotype.teacher_timeline(instance), f_teacher, names)))
+            pairs.append((f_student, f_teacher))
+            return
+
+        save_solution(ind, f_student, db, slots_structure, instance)
+        save_teacher_solution(ind, f_teacher, db, instance)
+        print(f"--> Saved pair: {f_student} & {f_teacher}")
+
+
+    # Student Best
+    best_student = sorted(pareto_front, key=lambda ind: ind.fitness.values[0])[0]
+    print(f"Best Student (f1={best_student.fitness.values[0]})")
+    save_pair(best_student, "1_best_student")
+
+    # Didactic Best
+    best_didactic = sorted(pareto_front, key=lambda ind: ind.fitness.values[1])[0]
+    print(f"Best Didactic (f2={best_didactic.fitness.values[1]})")
+    save_pair(best_didactic, "2_best_didactic")
+
+    # Teacher Best
+    best_teacher = sorted(pareto_front, key=lambda ind: ind.fitness.values[2])[0]
+    print(f"Best Teacher (f3={best_teacher.fitness.values[2]})")
+    save_pair(best_teacher, "3_best_teacher")
+
+    # Compromise
+    best_compromise = sorted(pareto_front, key=lambda ind: sum(ind.fitness.values))[0]
+    print(f"Best Compromise (Sum={sum(best_compromise.fitness.values)})")
+    save_pair(best_compromise, "4_compromise")
+
+    if least_changed is not None:
+        print(f"Least Changed (Sum={sum(least_changed.fitness.values)})")
+        save_pair(least_changed, "5_least_changed")
+
+    if not jobs:
+        return
+    processes = min(n_workers if n_workers > 0 else multiprocessing.cpu_count(), len(jobs))
+    if processes > 1:
+        with multiprocessing.Pool(processes) as pool:
+            pool.map(_write_job, jobs, chunksize=1)
+    else:
+        for job in jobs:
+            _write_job(job)
+    for f_student, f_teacher in pairs:
+        print(f"--> Saved pair: {f_student} & {f_teacher}")
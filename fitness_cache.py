@@ -0,0 +1,66 @@
+import hashlib
+from array import array
+from collections import OrderedDict
+
+
+class FitnessCache:
+    # Кеш пристосованості за вмістом перестановки. Працює у головному процесі
+    # як обгортка над пакетним обчисленням популяції, тому однаково
+    # підходить і для послідовного обчислення, і для пулу процесів: на
+    # обчислення відправляються лише унікальні перестановки, яких ще немає в кеші.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def genome_key(genome):
+        return hashlib.blake2b(array('I', genome).tobytes(), digest_size=16).digest()
+
+    def _store(self, key, fitness):
+        self._entries[key] = fitness
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def evaluate_many(self, individuals, evaluate):
+        # evaluate отримує список унікальних особин, яких немає в кеші,
+        # і повертає список їх значень пристосованості
+        individuals = list(individuals)
+        keys = [self.genome_key(ind) for ind in individuals]
+        results = [None] * len(individuals)
+        pending = {}
+        for idx, key in enumerate(keys):
+            fitness = self._entries.get(key)
+            if fitness is not None:
+                self._entries.move_to_end(key)
+                results[idx] = fitness
+                self.hits += 1
+            elif key in pending:
+                # копія іншої особини цього ж покоління
+                self.hits += 1
+            else:
+                pending[key] = idx
+                self.misses += 1
+
+        evaluated = dict(zip(pending, evaluate([individuals[idx] for idx in pending.values()])))
+        for key, fitness in evaluated.items():
+            self._store(key, fitness)
+        for idx, key in enumerate(keys):
+            if results[idx] is None:
+                results[idx] = evaluated[key]
+        return results
+
+    # Методи pop_* повертають лічильник з часу попереднього виклику;
+    # сигнатура дозволяє зареєструвати їх у tools.Statistics
+    def pop_hits(self, _values=None):
+        hits, self.hits = self.hits, 0
+        return hits
+
+    def pop_misses(self, _values=None):
+        misses, self.misses = self.misses, 0
+        return misses
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+# Гіпероб'єм (мінімізація) - об'єм області, домінованої точками фронту та
+# обмеженої опорною точкою. Для трьох цілей простір ріжеться площинами за
+# значеннями f3, і в кожному шарі рахується площа двовимірного фронту.
+
+def hypervolume_2d(points, reference):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    points = points[np.all(points < reference, axis=1)]
+    if len(points) == 0:
+        return 0.0
+    points = points[np.lexsort((points[:, 1], points[:, 0]))]
+    best_f2 = np.minimum.accumulate(points[:, 1])
+    widths = np.diff(np.append(points[:, 0], reference[0]))
+    return float(np.sum(widths * (reference[1] - best_f2)))
+
+
+def hypervolume(points, reference):
+    reference = np.asarray(reference, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    points = points[np.all(points < reference, axis=1)]
+    if len(points) == 0:
+        return 0.0
+    points = points[np.argsort(points[:, 2], kind="stable")]
+    heights = np.diff(np.append(points[:, 2], reference[2]))
+    volume = 0.0
+    for i, height in enumerate(heights):
+        if height > 0:
+            volume += height * hypervolume_2d(points[:i + 1, :2], reference[:2])
+    return volume
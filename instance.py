@@ -0,0 +1,153 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from config import lessons_available_per_day
+from prepare import SLOT_EMPTY, SLOT_ONLINE, SLOT_OFFLINE, SLOT_UNWANTED
+
+
+class ProblemInstance:
+    # Масиви, з яких складається скомпільована задача
+    ARRAY_FIELDS = (
+        "class_ids", "teacher_ids",
+        "lesson_class", "lesson_teacher", "lesson_subject", "lesson_blinking",
+        "teacher_can_offline", "teacher_travel_time", "teacher_wants_windows",
+        "teacher_max_online_from_school",
+        "subject_priority_offline", "subject_difficulty", "subject_max_stack",
+        "subject_preferred_stack", "subject_max_per_day",
+        "slot_types",
+    )
+
+    def __init__(self, **arrays):
+        for name in self.ARRAY_FIELDS:
+            setattr(self, name, arrays[name])
+        # Каталог, з якого масиви відображені в пам'ять (див. load)
+        self.source_dir = None
+        self.n_lessons = len(self.lesson_class)
+        self.n_classes = self.slot_types.shape[0]
+        self.n_teachers = len(self.teacher_can_offline)
+        self.n_subjects = len(self.subject_difficulty)
+        self._init_lookup()
+
+    def _init_lookup(self):
+        # Поелементне індексування numpy-масивів у циклі декодера повільніше
+        # за списки, тому декодер працює з їх копіями у вигляді списків Python
+        self.lookup = SimpleNamespace(**{
+            name: getattr(self, name).tolist() for name in self.ARRAY_FIELDS
+        })
+        self.slot_masks = self._build_slot_masks()
+        self.candidates = self._build_candidate_index()
+
+    def _build_candidate_index(self):
+        # Придатні позиції кожного класу у порядку обходу декодера (slot, потім day),
+        # окремо звичайні (O, U) та компромісні (W) слоти
+        candidates = SimpleNamespace(preferred=[], compromise=[])
+        for days in self.lookup.slot_types:
+            preferred = []
+            compromise = []
+            for slot_idx in range(lessons_available_per_day):
+                for day_idx in range(7):
+                    slot_type = days[day_idx][slot_idx]
+                    pos = day_idx * lessons_available_per_day + slot_idx
+                    if slot_type == SLOT_ONLINE or slot_type == SLOT_OFFLINE:
+                        preferred.append((pos, day_idx, slot_idx, slot_type))
+                    elif slot_type == SLOT_UNWANTED:
+                        compromise.append((pos, day_idx, slot_idx, slot_type))
+            candidates.preferred.append(tuple(preferred))
+            candidates.compromise.append(tuple(compromise))
+        return candidates
+
+    def _build_slot_masks(self):
+        # Бітові маски позицій кожного класу; позиція = slot * 7 + day,
+        # тобто молодший біт відповідає першій позиції в порядку обходу декодера
+        masks = SimpleNamespace(preferred=[], unwanted=[], offline=[])
+        for days in self.lookup.slot_types:
+            preferred = unwanted = offline = 0
+            for day_idx, day_slots in enumerate(days):
+                for slot_idx, slot_type in enumerate(day_slots):
+                    bit = 1 << (slot_idx * 7 + day_idx)
+                    if slot_type == SLOT_ONLINE or slot_type == SLOT_OFFLINE:
+                        preferred |= bit
+                    elif slot_type == SLOT_UNWANTED:
+                        unwanted |= bit
+                    if slot_type == SLOT_OFFLINE:
+                        offline |= bit
+            masks.preferred.append(preferred)
+            masks.unwanted.append(unwanted)
+            masks.offline.append(offline)
+        return masks
+
+    def save(self, directory):
+        for name in self.ARRAY_FIELDS:
+            np.save(Path(directory) / f"{name}.npy", getattr(self, name))
+
+    @classmethod
+    def load(cls, directory):
+        # Масиви відображаються в пам'ять лише для читання, тож процеси пулу,
+        # які відкривають той самий каталог, спільно використовують сторінки
+        arrays = {
+            name: np.load(Path(directory) / f"{name}.npy", mmap_mode="r")
+            for name in cls.ARRAY_FIELDS
+        }
+        instance = cls(**arrays)
+        instance.source_dir = str(directory)
+        return instance
+
+    def __getstate__(self):
+        if self.source_dir is not None:
+            return {"source_dir": self.source_dir}
+        state = self.__dict__.copy()
+        del state["lookup"]
+        del state["slot_masks"]
+        del state["candidates"]
+        return state
+
+    def __setstate__(self, state):
+        if set(state) == {"source_dir"}:
+            self.__dict__.update(ProblemInstance.load(state["source_dir"]).__dict__)
+            return
+        self.__dict__.update(state)
+        self._init_lookup()
+
+
+def _dense(objects, attr, dtype, default=0):
+    size = max((obj.id for obj in objects), default=-1) + 1
+    values = np.full(size, default, dtype=dtype)
+    for obj in objects:
+        values[obj.id] = getattr(obj, attr)
+    return values
+
+
+def compile_instance(db, slots_structure):
+    teachers = list(db.teacher_dict.values())
+    subjects = list(db.subject_dict.values())
+    classes = list(db.school_class_dict.values())
+    lessons = db.lesson_list
+    for idx, lesson in enumerate(lessons):
+        if lesson.id != idx:
+            raise ValueError(f"Lesson id {lesson.id} does not match its position {idx} in lesson_list.")
+
+    n_classes = max((c.id for c in classes), default=-1) + 1
+    slot_types = np.full((n_classes, 7, lessons_available_per_day), SLOT_EMPTY, dtype=np.int8)
+    for c_id, days in slots_structure.items():
+        slot_types[c_id] = days
+
+    return ProblemInstance(
+        class_ids=np.array([c.id for c in classes], dtype=np.int32),
+        teacher_ids=np.array([t.id for t in teachers], dtype=np.int32),
+        lesson_class=np.array([l.school_class_id for l in lessons], dtype=np.int32),
+        lesson_teacher=np.array([l.teacher_id for l in lessons], dtype=np.int32),
+        lesson_subject=np.array([l.subject_id for l in lessons], dtype=np.int32),
+        lesson_blinking=np.array([l.is_blinking for l in lessons], dtype=bool),
+        teacher_can_offline=_dense(teachers, "can_offline", bool, True),
+        teacher_travel_time=_dense(teachers, "travel_time", np.int32),
+        teacher_wants_windows=_dense(teachers, "wants_windows", bool),
+        teacher_max_online_from_school=_dense(teachers, "max_online_lessons_from_underground", np.int32),
+        subject_priority_offline=_dense(subjects, "priority_offline", bool),
+        subject_difficulty=_dense(subjects, "difficulty", np.int32),
+        subject_max_stack=_dense(subjects, "max_stack", np.int32),
+        subject_preferred_stack=_dense(subjects, "preferred_stack", np.int32),
+        subject_max_per_day=_dense(subjects, "max_per_day", np.int32),
+        slot_types=slot_types,
+    )
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from config import *
+from data_base import DataBase
+from prepare import parse_preferences
+from instance import ProblemInstance, compile_instance
+from teacher import Teacher
+from subject import Subject
+from school_class import SchoolClass
+from lesson import Lesson
+
+# Змінюється разом з будь-якою зміною розбору таблиць або формату кешу
+PARSER_VERSION = 2
+
+TEACHER_FIELDS = ("can_offline", "travel_time", "wants_windows", "max_online_lessons_from_underground")
+SUBJECT_FIELDS = ("priority_offline", "difficulty", "max_stack", "preferred_stack", "max_per_day")
+
+
+def cache_key(hours_path, preferences_path):
+    digest = hashlib.sha256()
+    settings = (PARSER_VERSION, lessons_available_per_day,
+                top_left_cell_of_day_templates, number_of_day_templates)
+    digest.update(repr(settings).encode())
+    for path in (hours_path, preferences_path):
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:32]
+
+
+def _reset_registries():
+    Teacher.reset_registry()
+    Subject.reset_registry()
+    SchoolClass.reset_registry()
+    Lesson.reset_registry()
+
+
+def _is_dense(objects):
+    return [obj.id for obj in objects] == list(range(len(objects)))
+
+
+def parse_problem(hours_path=hours_filename, preferences_path=preferences_filename):
+    import excel_parser as ep
+    _reset_registries()
+    db = DataBase()
+    ep.load_hours(hours_path, db)
+    slots_structure = parse_preferences(db, preferences_path)
+    return db, slots_structure, compile_instance(db, slots_structure)
+
+
+def save_problem(directory, db, slots_structure, instance):
+    directory = Path(directory)
+    teachers = list(db.teacher_dict.values())
+    subjects = list(db.subject_dict.values())
+    classes = list(db.school_class_dict.values())
+    # Після відновлення id збігаються з порядком створення об'єктів,
+    # тож задачі з пропусками в id не кешуються
+    if not (_is_dense(teachers) and _is_dense(subjects) and _is_dense(classes)):
+        print("Instance cache skipped: object ids are not contiguous.")
+        return False
+
+    # Кожен запуск пише у власну тимчасову теку, тож паралельні запуски
+    # на тих самих таблицях не заважають один одному
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=directory.name + ".tmp-", dir=directory.parent))
+    instance.save(tmp_dir)
+    meta = {
+        "parser_version": PARSER_VERSION,
+        "classes": [c.name for c in classes],
+        "slot_classes": list(slots_structure.keys()),
+        "teachers": [[t.name] + [getattr(t, f) for f in TEACHER_FIELDS] for t in teachers],
+        "subjects": [[s.name] + [getattr(s, f) for f in SUBJECT_FIELDS] for s in subjects],
+    }
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    _evict_stale(directory.parent)
+    try:
+        tmp_dir.rename(directory)
+    except OSError:
+        # інший запуск уже зберіг цю задачу
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return (directory / "meta.json").exists()
+    return True
+
+
+def _evict_stale(cache_root):
+    # Видаляються лише записи іншої версії розбору: записи інших таблиць
+    # (зокрема синтетичних задач) і тимчасові теки інших запусків лишаються
+    for entry in Path(cache_root).iterdir():
+        try:
+            meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if meta.get("parser_version") != PARSER_VERSION:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def load_cached_problem(directory):
+    directory = Path(directory)
+    meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+    if meta["parser_version"] != PARSER_VERSION:
+        raise ValueError("parser version mismatch")
+    instance = ProblemInstance.load(directory)
+
+    _reset_registries()
+    db = DataBase()
+    for name in meta["classes"]:
+        db.school_class_dict[name] = SchoolClass(name)
+    for name, *values in meta["teachers"]:
+        teacher = Teacher(name)
+        for field, value in zip(TEACHER_FIELDS, values):
+            setattr(teacher, field, value)
+        db.teacher_dict[name] = teacher
+    for name, *values in meta["subjects"]:
+        subject = Subject(name)
+        for field, value in zip(SUBJECT_FIELDS, values):
+            setattr(subject, field, value)
+        db.subject_dict[name] = subject
+    for c_id, s_id, t_id, blinking in zip(instance.lookup.lesson_class, instance.lookup.lesson_subject,
+                                          instance.lookup.lesson_teacher, instance.lookup.lesson_blinking):
+        db.lesson_list.append(Lesson(c_id, s_id, t_id, is_blinking=blinking))
+
+    slot_types = instance.lookup.slot_types
+    slots_structure = {c_id: [tuple(day) for day in slot_types[c_id]] for c_id in meta["slot_classes"]}
+    return db, slots_structure, instance
+
+
+def load_problem(hours_path=hours_filename, preferences_path=preferences_filename, use_cache=None):
+    # Повертає (db, slots_structure, instance); FileNotFoundError - якщо таблиць немає
+    if use_cache is None:
+        use_cache = use_instance_cache
+    if not use_cache:
+        return parse_problem(hours_path, preferences_path)
+
+    directory = Path(instance_cache_foldername) / cache_key(hours_path, preferences_path)
+    if (directory / "meta.json").exists():
+        try:
+            problem = load_cached_problem(directory)
+            print(f"Problem loaded from cache: {directory}")
+            return problem
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: instance cache {directory} is unreadable ({e}), parsing workbooks.")
+
+    db, slots_structure, instance = parse_problem(hours_path, preferences_path)
+    if save_problem(directory, db, slots_structure, instance):
+        # Повертаємо відображену в пам'ять копію, щоб процеси пулу отримували лише шлях
+        instance = ProblemInstance.load(directory)
+    return db, slots_structure, instance
@@ -0,0 +1,92 @@
+import cProfile
+import json
+import pstats
+import time
+from pathlib import Path
+
+from prepare import SLOT_UNWANTED
+
+BUILDER_COUNTERS = ("placement_attempts", "can_place_calls", "travel_checks",
+                    "compromise_fallbacks", "unplaced_lessons")
+
+
+def instrumented(builder_class):
+    # Підклас будівника, що рахує роботу розстановки в self.counters
+    # (EvaluationStats). Звичайні будівники лічильників не мають, тож без
+    # інструментування гарячий шлях не змінюється. Рушій "bitmask" перевіряє
+    # слоти масками, тому _can_place у ньому не викликається.
+    class InstrumentedBuilder(builder_class):
+        counters = None
+
+        def _try_place_lesson(self, lesson_id):
+            self.counters.placement_attempts += 1
+            placed = super()._try_place_lesson(lesson_id)
+            if not placed:
+                # жоден звичайний слот не підійшов, і компромісний теж
+                self.counters.compromise_fallbacks += 1
+                self.counters.unplaced_lessons += 1
+            return placed
+
+        def _can_place(self, t_id, day, slot, slot_type):
+            self.counters.can_place_calls += 1
+            return super()._can_place(t_id, day, slot, slot_type)
+
+        def _check_teacher_travel_constraint(self, t_id, day, slot, to_school):
+            self.counters.travel_checks += 1
+            return super()._check_teacher_travel_constraint(t_id, day, slot, to_school)
+
+        def _commit_lesson(self, lesson_id, c_id, t_id, day, slot, slot_type):
+            if slot_type == SLOT_UNWANTED:
+                self.counters.compromise_fallbacks += 1
+            super()._commit_lesson(lesson_id, c_id, t_id, day, slot, slot_type)
+
+    InstrumentedBuilder.__name__ = "Instrumented" + builder_class.__name__
+    InstrumentedBuilder.__qualname__ = InstrumentedBuilder.__name__
+    return InstrumentedBuilder
+
+
+class Instrumentation:
+    # Запис часу фаз кожного покоління і лічильників будівника в JSONL,
+    # за бажанням - профілювання головного процесу через cProfile.
+    # filename=None - лише профілювання. Після продовження з контрольної
+    # точки (start_gen > 0) записи до start_gen зберігаються, а записи
+    # поколінь, що будуть обчислені знову, відкидаються.
+    def __init__(self, filename, stats, profile_filename=None, start_gen=0):
+        self.filename = filename
+        self.stats = stats
+        self.file = None
+        if filename is not None:
+            Path(filename).parent.mkdir(parents=True, exist_ok=True)
+            kept = []
+            if start_gen > 0 and Path(filename).exists():
+                with open(filename, encoding="utf-8") as f:
+                    kept = [line for line in f if json.loads(line)["gen"] <= start_gen]
+            self.file = open(filename, "w", encoding="utf-8")
+            self.file.writelines(kept)
+        self.profile_filename = profile_filename
+        self.profiler = None
+        if profile_filename is not None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.stats.pop_builder_counters()
+        self._last = time.perf_counter()
+
+    def record(self, gen, nevals, **seconds):
+        now = time.perf_counter()
+        seconds["total"] = now - self._last
+        self._last = now
+        line = {"gen": gen, "nevals": nevals, "seconds": seconds, "builder": self.stats.pop_builder_counters()}
+        if self.file is not None:
+            self.file.write(json.dumps(line) + "\n")
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            print(f"Instrumentation saved to {self.filename}")
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_filename)
+            print(f"Profile saved to {self.profile_filename}")
+            pstats.Stats(self.profiler).sort_stats("cumulative").print_stats(20)
+            self.profiler = None
@@ -0,0 +1,219 @@
+import multiprocessing
+import queue
+import random
+
+import numpy as np
+from deap import creator, tools
+
+import ga
+from evaluation import init_worker, evaluate_batch
+from evolution import ea_mu_plus_lambda
+from seeding import initial_population
+from termination import Termination
+from parameters import *
+
+
+# Модель островів: кожна популяція еволюціонує у власному процесі та раз на
+# MIGRATION_INTERVAL поколінь надсилає сусідам свої недоміновані особини.
+# Сусіди острова визначаються топологією: функція повертає номери островів,
+# яким острів index надсилає мігрантів.
+TOPOLOGIES = {
+    "ring": lambda index, n_islands: [(index + 1) % n_islands],
+    "complete": lambda index, n_islands: [i for i in range(n_islands) if i != index],
+}
+
+
+def _destinations(topology, n_islands):
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology '{topology}'. Available: {', '.join(TOPOLOGIES)}.")
+    return [TOPOLOGIES[topology](index, n_islands) for index in range(n_islands)]
+
+
+def _individuals(genomes, fitnesses, phenotypes=None):
+    individuals = []
+    for idx, (genome, fitness) in enumerate(zip(genomes, fitnesses)):
+        ind = creator.Individual(genome)
+        ind.fitness.values = fitness
+        if phenotypes is not None:
+            ind.phenotype = phenotypes[idx]
+        individuals.append(ind)
+    return individuals
+
+
+class Migration:
+    # Повідомлення острова - (покоління, номер острова, гени, пристосованості);
+    # гени None означають, що острів завершив еволюцію на цьому поколінні
+    # і більше мігрантів не надсилатиме
+    def __init__(self, index, toolbox, mu, ngen, inbox, outboxes, sources,
+                 interval=MIGRATION_INTERVAL, n_migrants=MIGRANTS):
+        self.index = index
+        self.toolbox = toolbox
+        self.mu = mu
+        self.ngen = ngen
+        self.inbox = inbox
+        self.outboxes = outboxes
+        self.sources = sources
+        self.interval = interval
+        self.n_migrants = n_migrants
+        self.pending = []
+        self.finished = {}
+
+    def __call__(self, gen, population):
+        # після останнього покоління обмінюватися вже немає сенсу
+        if self.interval <= 0 or gen % self.interval or gen == self.ngen:
+            return
+        # мігранти - найменш скупчені особини першого фронту
+        first_front = tools.sortNondominated(population, len(population), first_front_only=True)[0]
+        migrants = tools.selNSGA2(first_front, min(self.n_migrants, len(first_front)))
+        message = (gen, self.index, [list(ind) for ind in migrants], [ind.fitness.values for ind in migrants])
+        for outbox in self.outboxes:
+            outbox.put(message)
+        immigrants = []
+        for _, _, genomes, fitnesses in self._receive(gen):
+            immigrants.extend(_individuals(genomes, fitnesses))
+        population[:] = self.toolbox.select(population + immigrants, self.mu)
+
+    def _receive(self, gen):
+        # Обмін синхронний: чекаємо мігрантів покоління gen від кожного джерела,
+        # яке ще еволюціонує, і впорядковуємо їх за номером острова, щоб
+        # результат не залежав від порядку надходження повідомлень. Швидше
+        # джерело може вже надіслати мігрантів наступного обміну - їх відкладаємо.
+        while True:
+            expected = [source for source in self.sources if self.finished.get(source, gen) >= gen]
+            arrived = {message[1]: message for message in self.pending if message[0] == gen}
+            if all(source in arrived for source in expected):
+                break
+            message = self.inbox.get()
+            if message[2] is None:
+                self.finished[message[1]] = message[0]
+            else:
+                self.pending.append(message)
+        self.pending = [message for message in self.pending if message[0] != gen]
+        return [arrived[source] for source in sorted(expected)]
+
+    def finish(self, gen):
+        for outbox in self.outboxes:
+            outbox.put((gen, self.index, None, None))
+        # Процес не завершиться, доки його повідомлення не прочитані, тому
+        # вичитуємо свою чергу, поки не завершаться всі джерела
+        while len(self.finished) < len(self.sources):
+            message = self.inbox.get()
+            if message[2] is None:
+                self.finished[message[1]] = message[0]
+
+
+def _run_island(index, seed, instance, population_size, generations, time_budget, stagnation_generations,
+                warm_front, warm_share, inbox, outboxes, sources, results):
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    init_worker(instance)
+    toolbox = ga.create_toolbox(instance.n_lessons)
+    stats = ga.create_statistics()
+    ga.register_batch_evaluation(toolbox, stats, evaluate_batch)
+    local_search = ga.create_local_search(instance, stats)
+    migration = Migration(index, toolbox, population_size, generations, inbox, outboxes, sources)
+
+    pareto_front = tools.ParetoFront()
+    pop, logbook = ea_mu_plus_lambda(
+        initial_population(toolbox, instance, population_size, warm_front=warm_front, warm_share=warm_share),
+        toolbox,
+        mu=population_size,
+        lambda_=population_size,
+        cxpb=CXPB, mutpb=MUTPB,
+        ngen=generations,
+        stats=stats,
+        halloffame=pareto_front,
+        verbose=index == 0,
+        migrate=migration,
+        local_search=local_search,
+        termination=Termination(time_budget, stagnation_generations)
+    )
+    front = ([list(ind) for ind in pareto_front], [ind.fitness.values for ind in pareto_front],
+             [getattr(ind, "phenotype", None) for ind in pareto_front])
+    results.put((index, front, logbook))
+    migration.finish(logbook[-1]["gen"])
+
+
+def merge_logbooks(logbooks):
+    # Зведений журнал для графіка збіжності: найкращі значення серед усіх
+    # островів і середнє їхніх середніх
+    merged = tools.Logbook()
+    merged.header = ['gen', 'nevals', 'avg', 'min']
+    # острови можуть зупинитися на різних поколіннях
+    by_gen = {}
+    for logbook in logbooks:
+        for record in logbook:
+            by_gen.setdefault(record["gen"], []).append(record)
+    for gen, records in sorted(by_gen.items()):
+        merged.record(
+            gen=gen,
+            nevals=sum(record["nevals"] for record in records),
+            avg=np.mean([record["avg"] for record in records], axis=0),
+            min=np.min([record["min"] for record in records], axis=0),
+        )
+    return merged
+
+
+def evolve_islands(instance, n_islands=ISLANDS, population_size=POPULATION_SIZE, generations=GENERATIONS,
+                   topology=MIGRATION_TOPOLOGY, time_budget=TIME_BUDGET,
+                   stagnation_generations=STAGNATION_GENERATIONS, warm_front=None, warm_share=WARM_START_SHARE):
+    # Екземпляр задачі, завантажений з кешу, передається процесам лише шляхом
+    # до відображених у пам'ять масивів, тож усі острови ділять одну копію
+    ga.create_types()
+    destinations = _destinations(topology, n_islands)
+    sources = [[i for i, targets in enumerate(destinations) if index in targets] for index in range(n_islands)]
+    base_seed = random.randrange(2**31)
+    print(f"--- Starting Island Evolution ({n_islands} islands, topology: {topology}, "
+          f"Pop: {population_size}, Gens: {generations}) ---")
+    print("Progress of island 0:")
+
+    inboxes = [multiprocessing.Queue() for _ in range(n_islands)]
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_run_island,
+            args=(index, base_seed + index, instance, population_size, generations,
+                  time_budget, stagnation_generations,
+                  [list(ind) for ind in warm_front] if warm_front else None, warm_share,
+                  inboxes[index], [inboxes[i] for i in destinations[index]], sources[index], results),
+            daemon=True
+        )
+        for index in range(n_islands)
+    ]
+    for process in processes:
+        process.start()
+
+    island_results = {}
+    try:
+        while len(island_results) < n_islands:
+            try:
+                index, front, logbook = results.get(timeout=1)
+                island_results[index] = (front, logbook)
+            except queue.Empty:
+                # острів, що впав, не надішле мігрантів, і решта чекатиме вічно
+                failed = [p for p in processes if p.exitcode not in (None, 0)]
+                if failed:
+                    raise RuntimeError(f"Island process exited with code {failed[0].exitcode}.")
+    finally:
+        for process in processes:
+            if process.is_alive() and len(island_results) < n_islands:
+                process.terminate()
+            process.join()
+
+    pareto_front = tools.ParetoFront()
+    logbooks = []
+    for index in range(n_islands):
+        (genomes, fitnesses, phenotypes), logbook = island_results[index]
+        island_front = _individuals(genomes, fitnesses, phenotypes)
+        print(f"Island {index}: {len(island_front)} solutions on the front.")
+        pareto_front.update(island_front)
+        logbooks.append(logbook)
+    if LOCAL_SEARCH_FINAL:
+        ga.create_local_search(instance).polish(pareto_front)
+
+    print("\n--- Evolution Finished ---")
+    print(f"Pareto Front Size: {len(pareto_front)}")
+    for i, ind in enumerate(pareto_front):
+        f1, f2, f3 = ind.fitness.values
+        print(f"Solution {i + 1}: Student={f1:.0f}, Didactic={f2:.0f}, Teacher={f3:.0f}")
+    return pareto_front, merge_logbooks(logbooks)
@@ -0,0 +1,174 @@
+import random
+
+from deap import creator, tools
+
+import parameters as P
+from config import lessons_available_per_day
+from builder import CELLS_PER_WEEK
+from evaluation import create_builder
+from prefix_cache import PrefixStateCache
+from phenotype import Phenotype
+
+
+def dominates(a, b):
+    return all(x <= y for x, y in zip(a, b)) and any(x < y for x, y in zip(a, b))
+
+
+class LocalSearch:
+    # Покращення членів фронту Парето цілеспрямованими ходами: урок, що бере
+    # участь у штрафі (вікно учнів чи вчителя, перевищення стеку або ліміту
+    # на день, нерозміщений урок), переставляється ближче до початку
+    # перестановки або обмінюється місцем з іншим уроком того ж класу.
+    # Хід змінює перестановку лише починаючи з певного гена, тому декодування
+    # продовжується зі збереженого стану спільного префікса. Приймаються лише
+    # ходи, результат яких домінує поточну особину.
+    def __init__(self, instance, interval=P.LOCAL_SEARCH_INTERVAL, members=P.LOCAL_SEARCH_MEMBERS,
+                 moves=P.LOCAL_SEARCH_MOVES):
+        self.instance = instance
+        self.tables = instance.lookup
+        self.interval = interval
+        self.members = members
+        self.moves = moves
+        self.builder = None
+        self.prefix_cache = PrefixStateCache(P.PREFIX_CACHE_INTERVAL, P.PREFIX_CACHE_CAPACITY)
+        self.class_lessons = [[] for _ in range(instance.n_classes)]
+        for lesson_id, c_id in enumerate(self.tables.lesson_class):
+            self.class_lessons[c_id].append(lesson_id)
+        self.improvements = 0
+
+    def __call__(self, gen, population, halloffame=None):
+        # Крок еволюції: покращує найменш скупчених членів першого фронту
+        # популяції і повертає кількість обчислень пристосованості
+        if self.interval <= 0 or gen % self.interval:
+            return 0
+        first_front = tools.sortNondominated(population, len(population), first_front_only=True)[0]
+        chosen = tools.selNSGA2(first_front, min(self.members, len(first_front)))
+        nevals = 0
+        improved = []
+        for ind in chosen:
+            better, evals = self.improve(ind)
+            nevals += evals
+            if better is not None:
+                # той самий об'єкт може займати кілька місць у популяції
+                population[:] = [better if member is ind else member for member in population]
+                improved.append(better)
+        if halloffame is not None and improved:
+            halloffame.update(improved)
+        return nevals
+
+    def polish(self, pareto_front):
+        # Покращення всього фронту після еволюції; повертає кількість обчислень
+        nevals = 0
+        improved = []
+        front_size = len(pareto_front)
+        for ind in list(pareto_front):
+            better, evals = self.improve(ind)
+            nevals += evals
+            if better is not None:
+                improved.append(better)
+        pareto_front.update(improved)
+        print(f"Local search: {len(improved)} of {front_size} front members improved "
+              f"with {nevals} evaluations.")
+        return nevals
+
+    def improve(self, individual):
+        # Повертає (покращена особина або None, кількість обчислень)
+        genome = list(individual)
+        fitness = self._evaluate(genome)
+        targets = self._targets()
+        nevals = 1
+        improved = False
+        for _ in range(self.moves):
+            if not targets:
+                break
+            candidate = self._move(genome, random.choice(targets))
+            if candidate is None:
+                continue
+            candidate_fitness = self._evaluate(candidate)
+            nevals += 1
+            if dominates(candidate_fitness, fitness):
+                genome, fitness = candidate, candidate_fitness
+                phenotype = Phenotype.from_builder(self.builder)
+                targets = self._targets()
+                improved = True
+        if not improved:
+            return None, nevals
+        self.improvements += 1
+        better = creator.Individual(genome)
+        better.fitness.values = fitness
+        better.phenotype = phenotype
+        return better, nevals
+
+    def pop_improvements(self, _values=None):
+        improvements, self.improvements = self.improvements, 0
+        return improvements
+
+    def _evaluate(self, genome):
+        if self.builder is None:
+            self.builder = create_builder(genome, self.instance)
+        else:
+            self.builder.reset(genome)
+        return self.builder.build(self.prefix_cache)
+
+    def _move(self, genome, lesson_id):
+        i = genome.index(lesson_id)
+        candidate = genome[:]
+        if random.random() < 0.5:
+            # раніше в перестановці - раніше обирає собі слот
+            if i == 0:
+                return None
+            j = random.randrange(i)
+            del candidate[i]
+            candidate.insert(j, lesson_id)
+        else:
+            other = random.choice(self.class_lessons[self.tables.lesson_class[lesson_id]])
+            if other == lesson_id:
+                return None
+            j = genome.index(other)
+            candidate[i], candidate[j] = candidate[j], candidate[i]
+        return candidate
+
+    def _targets(self):
+        # Уроки з останнього декодування, через які нараховано штрафи
+        tables = self.tables
+        builder = self.builder
+        targets = {lesson_id for lesson_id, pos in enumerate(builder.lesson_position) if pos == -1}
+
+        for c_id in range(self.instance.n_classes):
+            for day in range(7):
+                start = c_id * CELLS_PER_WEEK + day * lessons_available_per_day
+                row = builder.class_lessons[start:start + lessons_available_per_day]
+                lessons = [l_id for l_id in row if l_id != -1]
+                if _has_gap(row):
+                    targets.update(lessons)
+                day_counts = {}
+                run_subject, run = None, []
+                for l_id in row + [-1]:
+                    s_id = tables.lesson_subject[l_id] if l_id != -1 else None
+                    if s_id is not None:
+                        day_counts[s_id] = day_counts.get(s_id, 0) + 1
+                    if s_id == run_subject and s_id is not None:
+                        run.append(l_id)
+                        continue
+                    if run_subject is not None and len(run) > tables.subject_max_stack[run_subject]:
+                        targets.update(run)
+                    run_subject, run = s_id, [l_id]
+                for l_id in lessons:
+                    s_id = tables.lesson_subject[l_id]
+                    if day_counts[s_id] > tables.subject_max_per_day[s_id]:
+                        targets.add(l_id)
+
+        for t_id in range(self.instance.n_teachers):
+            if tables.teacher_wants_windows[t_id]:
+                continue
+            for day in range(7):
+                start = t_id * CELLS_PER_WEEK + day * lessons_available_per_day
+                row = builder.teacher_lessons[start:start + lessons_available_per_day]
+                if _has_gap(row):
+                    targets.update(l_id for l_id in row if l_id != -1)
+        return sorted(targets)
+
+
+def _has_gap(row):
+    occupied = [slot for slot, l_id in enumerate(row) if l_id != -1]
+    return bool(occupied) and occupied[-1] - occupied[0] + 1 > len(occupied)
@@ -0,0 +1,99 @@
+import numpy as np
+
+import parameters as P
+from config import lessons_available_per_day
+
+
+# Векторизовані штрафи після розстановки (ті самі, що й у
+# TimetableBuilder._calculate_post_build_metrics). Усі функції приймають як
+# один розклад, так і пакет розкладів з додатковою першою віссю.
+
+def grids_from_positions(instance, positions):
+    # positions[..., lesson_id] = day * lessons_available_per_day + slot, або -1
+    positions = np.asarray(positions, dtype=np.int64)
+    single = positions.ndim == 1
+    positions = np.atleast_2d(positions)
+    batch = positions.shape[0]
+    cells = 7 * lessons_available_per_day
+
+    batch_idx, lesson_idx = np.nonzero(positions >= 0)
+    pos = positions[batch_idx, lesson_idx]
+
+    class_subjects = np.full((batch, instance.n_classes * cells), -1, dtype=np.int32)
+    class_subjects[batch_idx, instance.lesson_class[lesson_idx] * cells + pos] = instance.lesson_subject[lesson_idx]
+    teacher_busy = np.zeros((batch, instance.n_teachers * cells), dtype=bool)
+    teacher_busy[batch_idx, instance.lesson_teacher[lesson_idx] * cells + pos] = True
+
+    class_subjects = class_subjects.reshape(batch, instance.n_classes, 7, lessons_available_per_day)
+    teacher_busy = teacher_busy.reshape(batch, instance.n_teachers, 7, lessons_available_per_day)
+    if single:
+        return class_subjects[0], teacher_busy[0]
+    return class_subjects, teacher_busy
+
+
+def _count_gaps(occupied):
+    # Кількість вікон у рядку = кількість блоків зайнятих слотів мінус один
+    blocks = occupied[..., 0].astype(np.int64)
+    blocks += (occupied[..., 1:] & ~occupied[..., :-1]).sum(axis=-1)
+    return np.maximum(blocks - 1, 0)
+
+
+def post_build_penalties(instance, class_subjects, teacher_busy):
+    single = class_subjects.ndim == 3
+    if single:
+        class_subjects = class_subjects[np.newaxis]
+        teacher_busy = teacher_busy[np.newaxis]
+    batch, n_classes = class_subjects.shape[:2]
+    rows = class_subjects.reshape(-1, lessons_available_per_day)
+    occupied = rows >= 0
+    row_batch = np.arange(rows.shape[0]) // (n_classes * 7)
+
+    # f1: вікна учнів
+    f1 = _count_gaps(occupied).reshape(batch, -1).sum(axis=1) * P.P_STUDENT_GAP
+
+    # f2: стеки - максимальні послідовності уроків одного предмета
+    previous = np.full_like(rows, -1)
+    previous[:, 1:] = rows[:, :-1]
+    starts = occupied & (rows != previous)
+    flat_starts = starts.ravel()
+    run_idx = np.cumsum(flat_starts) - 1
+    run_lengths = np.bincount(run_idx[occupied.ravel()], minlength=int(flat_starts.sum()))
+    run_subjects = rows.ravel()[flat_starts]
+    max_stack = instance.subject_max_stack[run_subjects]
+    preferred_stack = instance.subject_preferred_stack[run_subjects]
+    stack_penalty = np.where(
+        run_lengths > max_stack,
+        (run_lengths - max_stack) * P.P_STACK_VIOLATION,
+        np.where(run_lengths != preferred_stack, P.P_STACK_NON_PREFERRED, 0)
+    )
+    run_batch = np.nonzero(flat_starts)[0] // (n_classes * 7 * lessons_available_per_day)
+    f2 = np.bincount(run_batch, weights=stack_penalty, minlength=batch).astype(np.int64)
+
+    # f2: складні предмети першим або останнім уроком
+    safe_subjects = np.where(occupied, rows, 0)
+    difficulty = np.where(occupied, instance.subject_difficulty[safe_subjects], 0)
+    hard = difficulty >= 7
+    edge_hard = hard[:, 0].astype(np.int64) + hard[:, lessons_available_per_day - 1:].sum(axis=1)
+    f2 += np.bincount(row_batch, weights=edge_hard, minlength=batch).astype(np.int64) * P.P_DIFFICULTY_DISTRIBUTION
+
+    # f2: перевищення кількості уроків предмета на день
+    n_subjects = instance.n_subjects
+    row_idx = np.nonzero(occupied)[0]
+    per_day = np.bincount(row_idx * n_subjects + rows[occupied], minlength=rows.shape[0] * n_subjects)
+    excess = np.maximum(per_day.reshape(-1, n_subjects) - instance.subject_max_per_day, 0).sum(axis=1)
+    f2 += np.bincount(row_batch, weights=excess, minlength=batch).astype(np.int64) * P.P_MAX_LESSONS_PER_DAY
+
+    # f2: крива складності тижня (понеділок і п'ятниця проти середини тижня)
+    daily = difficulty.sum(axis=1).reshape(batch, n_classes, 7)
+    mid = daily[..., 1:4].sum(axis=-1)
+    threshold = np.where(mid > 0, mid / 3, 1) * 1.15
+    heavy_days = (daily[..., 0] > threshold).astype(np.int64) + (daily[..., 4] > threshold)
+    f2 += heavy_days.sum(axis=1) * (P.P_DIFFICULTY_DISTRIBUTION * 2)
+
+    # f3: вікна вчителів, які їх не бажають
+    teacher_gaps = _count_gaps(teacher_busy).sum(axis=-1)
+    f3 = (teacher_gaps * ~instance.teacher_wants_windows).sum(axis=1) * P.P_TEACHER_GAP
+
+    if single:
+        return int(f1[0]), int(f2[0]), int(f3[0])
+    return f1, f2, f3
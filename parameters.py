@@ -29,4 +29,71 @@ POPULATION_SIZE = 150                # Розмір популяції
 GENERATIONS = 100                   # Кількість поколінь
 CXPB = 0.7                          # Ймовірність схрещування
 MUTPB = 0.1                         # Ймовірність мутації
-INDPB = 0.05                        # Ймовірність перестановки окремого гена при мутації
\ No newline at end of file
+INDPB = 0.05                        # Ймовірність перестановки окремого гена при мутації
+SEEDING_MIX = {"random": 0.7, "teacher": 0.2, "class": 0.1}
+                                    # Частки стратегій початкової популяції: "random" - випадкові
+                                    #       перестановки, "teacher" / "class" - першими уроки
+                                    #       найбільш обмежених вчителів / класів
+SEEDING_NOISE = 0.1                 # Шум упорядкування за обмеженістю (0 - усі особини однакові)
+WARM_START_SHARE = 0.2              # Частка популяції зі збереженого фронту (--warm-start)
+REPAIR_GENERATIONS = 10             # Кількість поколінь перепланування (cli.py repair)
+REPAIR_SHARE = 0.5                  # Частка популяції з перенесеного фронту при переплануванні
+PLACEMENT_ENGINE = "scan"           # Рушій розстановки уроків: "scan" - перебір усіх
+                                    #       позицій, "bitmask" - бітові маски зайнятості
+                                    #       (швидший лише на великих задачах, див. benchmark.py)
+PREFIX_CACHE = False                # Продовжувати декодування нащадка зі збереженого
+                                    #       стану спільного префікса
+PREFIX_CACHE_INTERVAL = 50          # Крок (у генах) між збереженими станами
+PREFIX_CACHE_CAPACITY = 1000        # Максимальна кількість збережених станів
+VECTORIZED_METRICS = True           # Обчислювати штрафи після розстановки засобами numpy
+FITNESS_CACHE_SIZE = 20000          # Максимальна кількість запам'ятованих значень
+                                    #       пристосованості (0 - кеш вимкнено)
+PHENOTYPE_CACHE_SIZE = 2000         # Кількість запам'ятованих розкладів останніх обчислених
+                                    #       особин для експорту (0 - декодувати заново)
+LOCAL_SEARCH_INTERVAL = 0           # Покращувати членів фронту локальним пошуком
+                                    #       кожні N поколінь (0 - не покращувати)
+LOCAL_SEARCH_FINAL = False          # Покращити локальним пошуком весь фронт Парето
+                                    #       після еволюції
+LOCAL_SEARCH_MEMBERS = 5            # Кількість членів фронту, що покращуються за покоління
+LOCAL_SEARCH_MOVES = 20             # Кількість спроб ходу для одного члена фронту
+TIME_BUDGET = 0                     # Бюджет часу на еволюцію, с (0 - без обмеження)
+STAGNATION_GENERATIONS = 0          # Зупинити еволюцію, якщо гіпероб'єм фронту Парето
+                                    #       не зростав помітно N поколінь (0 - не зупиняти)
+STAGNATION_TOLERANCE = 0.001        # Мінімальний відносний приріст гіпероб'єму
+HV_REFERENCE = None                 # Опорна точка гіпероб'єму (f1, f2, f3); None -
+                                    #       найгірші значення першого фронту + 10%
+CHECKPOINT_INTERVAL = 5             # Зберігати контрольну точку кожні N поколінь
+                                    #       (0 - не зберігати)
+
+# Паралельне обчислення пристосованості
+# --------------------------------------------------
+
+PARALLEL_EVALUATION = False         # Обчислювати пристосованість у пулі процесів
+N_WORKERS = 0                       # Кількість процесів (0 - за кількістю ядер)
+CHUNK_SIZE = 0                      # Кількість особин в одному завданні процесу
+                                    #       (0 - визначається автоматично)
+
+# Експорт розкладів
+# --------------------------------------------------
+
+FAST_EXPORT = True                  # Зберігати xlsx-розклади у write-only книги зі спільними
+                                    #       іменованими стилями (False - звичайні книги openpyxl)
+EXPORT_WORKERS = 0                  # Кількість процесів, що паралельно пишуть файли розкладів
+                                    #       (0 - за кількістю ядер, 1 - у цьому процесі)
+
+# Інструментування
+# --------------------------------------------------
+
+INSTRUMENTATION = False             # Записувати тривалість фаз кожного покоління і лічильники
+                                    #       будівника розкладу в output/instrumentation.jsonl
+PROFILE = False                     # Профілювати еволюцію cProfile (output/profile.pstats)
+
+# Модель островів
+# --------------------------------------------------
+
+ISLANDS = 1                         # Кількість популяцій, що еволюціонують в окремих
+                                    #       процесах (1 - одна популяція)
+MIGRATION_INTERVAL = 10             # Обмін мігрантами кожні N поколінь
+MIGRANTS = 5                        # Кількість мігрантів, яких острів надсилає кожному сусіду
+MIGRATION_TOPOLOGY = "ring"         # Топологія обміну: "ring" - наступному острову,
+                                    #       "complete" - усім іншим островам
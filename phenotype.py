@@ -0,0 +1,103 @@
+from array import array
+from collections import OrderedDict
+
+from config import lessons_available_per_day
+from fitness_cache import FitnessCache
+
+
+class Phenotype:
+    # Розклад, за яким обчислено пристосованість особини: позиція кожного
+    # уроку (day * lessons_available_per_day + slot, -1 - не розміщено) і
+    # бітові маски слотів, які вчитель проводить з приміщення школи
+    # (індекс t_id * 7 + day). Місце проведення онлайн-уроку залежить від
+    # порядку розстановки, тому з позицій його не відновити.
+    __slots__ = ("lesson_position", "teacher_day_school")
+
+    def __init__(self, lesson_position, teacher_day_school):
+        self.lesson_position = array("h", lesson_position)
+        self.teacher_day_school = array("H", teacher_day_school)
+
+    @classmethod
+    def from_builder(cls, builder):
+        return cls(builder.lesson_position, builder.teacher_day_school)
+
+    def schedule(self, instance):
+        # Те саме подання, що й TimetableBuilder.schedule
+        tables = instance.lookup
+        schedule = {c_id: [[None] * lessons_available_per_day for _ in range(7)] for c_id in tables.class_ids}
+        for l_id, pos in enumerate(self.lesson_position):
+            if pos != -1:
+                day, slot = divmod(pos, lessons_available_per_day)
+                schedule[tables.lesson_class[l_id]][day][slot] = l_id
+        return schedule
+
+    def teacher_timeline(self, instance):
+        # Те саме подання, що й TimetableBuilder.teacher_timeline
+        tables = instance.lookup
+        timeline = {t_id: [[None] * lessons_available_per_day for _ in range(7)] for t_id in tables.teacher_ids}
+        for l_id, pos in enumerate(self.lesson_position):
+            if pos != -1:
+                t_id = tables.lesson_teacher[l_id]
+                day, slot = divmod(pos, lessons_available_per_day)
+                school = self.teacher_day_school[t_id * 7 + day]
+                timeline[t_id][day][slot] = {
+                    'loc': 'SCHOOL' if (school >> slot) & 1 else 'HOME',
+                    'lesson_id': l_id
+                }
+        return timeline
+
+    def to_json(self):
+        return {"positions": self.lesson_position.tolist(), "school": self.teacher_day_school.tolist()}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["positions"], data["school"])
+
+
+class PhenotypeCache:
+    # Розклади останніх обчислених перестановок (ключ - як у FitnessCache).
+    # Дочірні процеси пулу передають свої записи головному процесу через
+    # take/merge разом з результатами пакета.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+
+    def put(self, genome, phenotype):
+        self.store(FitnessCache.genome_key(genome), phenotype)
+
+    def store(self, key, phenotype):
+        self._entries[key] = phenotype
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get(self, genome):
+        key = FitnessCache.genome_key(genome)
+        phenotype = self._entries.get(key)
+        if phenotype is not None:
+            self._entries.move_to_end(key)
+        return phenotype
+
+    def take(self):
+        entries = list(self._entries.items())
+        self._entries.clear()
+        return entries
+
+    def merge(self, entries):
+        for key, phenotype in entries:
+            self.store(key, phenotype)
+
+
+def phenotype_of(individual, instance):
+    # Збережений під час обчислення розклад особини; якщо його немає (особина
+    # з файлу фронту без розкладу, з контрольної точки чи витіснена з кешу),
+    # особина декодується один раз і розклад запам'ятовується
+    phenotype = getattr(individual, "phenotype", None)
+    if phenotype is None:
+        # evaluation сам імпортує цей модуль
+        from evaluation import create_builder
+        builder = create_builder(individual, instance)
+        builder.build()
+        phenotype = Phenotype.from_builder(builder)
+        individual.phenotype = phenotype
+    return phenotype
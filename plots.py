@@ -0,0 +1,64 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from mpl_toolkits.mplot3d import Axes3D
+from matplotlib.animation import FuncAnimation, PillowWriter
+
+
+# візуалізація
+def plot_pareto_3d(front):
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+
+    xs = [ind.fitness.values[0]//1000 for ind in front]  # F1
+    ys = [ind.fitness.values[1]//1000 for ind in front]  # F2
+    zs = [ind.fitness.values[2]//100 for ind in front]  # F3
+
+    ax.scatter(xs, ys, zs, c=zs, cmap='viridis', s=60, alpha=0.9, edgecolors='k')
+    plt.show()
+
+
+def plot_convergence(logbook, filename):
+    gen = logbook.select("gen")
+    avg_history = logbook.select("avg")
+    min_history = logbook.select("min")
+    avg_f1, avg_f2, avg_f3 = zip(*avg_history)
+    min_f1, min_f2, min_f3 = zip(*min_history)
+    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 12), sharex=True)
+    ax1.plot(gen, avg_f1, label="Average", color='blue', linestyle='--')
+    ax1.plot(gen, min_f1, label="Minimum (Best)", color='blue', linewidth=2)
+    ax1.set_ylabel('(f1)')
+    ax1.set_title('Convergence of Objectives')
+    ax1.grid(True)
+    ax1.legend()
+    ax2.plot(gen, avg_f2, label="Average", color='green', linestyle='--')
+    ax2.plot(gen, min_f2, label="Minimum (Best)", color='green', linewidth=2)
+    ax2.set_ylabel('(f2)')
+    ax2.grid(True)
+    ax3.plot(gen, avg_f3, label="Average", color='red', linestyle='--')
+    ax3.plot(gen, min_f3, label="Minimum (Best)", color='red', linewidth=2)
+    ax3.set_ylabel('(f3)')
+    ax3.set_xlabel('Generation')
+    ax3.grid(True)
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300)
+    print(f"Convergence plot saved to {filename}")
+    plt.show()
+
+
+def save_rotation_animation(front, filename="pareto_3d_rotation.gif"):
+    print(f"--- Rendering 3D Animation ({filename}) ---")
+    xs = [ind.fitness.values[0]//1000 for ind in front]  # F1: Students
+    ys = [ind.fitness.values[1]//1000 for ind in front]  # F2: Didactic
+    zs = [ind.fitness.values[2]//100 for ind in front]  # F3: Teachers
+    fig = plt.figure(figsize=(10, 8))
+    ax = fig.add_subplot(111, projection='3d')
+    ax.scatter(xs, ys, zs, c=zs, cmap='viridis', s=60, alpha=0.9, edgecolors='k')
+
+    def update(angle):
+        ax.view_init(elev=30, azim=angle)
+        return fig,
+    anim = FuncAnimation(fig, update, frames=np.arange(0, 360, 2), interval=50)
+    anim.save(filename, writer=PillowWriter(fps=20))
+
+    print(f"Animation saved to {filename}")
+    plt.close(fig)
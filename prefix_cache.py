@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+
+class PrefixStateCache:
+    # Стан декодера після кожних interval генів уже оцінених особин.
+    # Жадібне декодування детерміноване, тому стан після префікса залежить
+    # лише від самого префікса, і нащадок може продовжити декодування з
+    # найдовшого префікса, спільного з будь-якою збереженою особиною.
+    def __init__(self, interval, capacity):
+        self.interval = interval
+        self.capacity = capacity
+        self._entries = OrderedDict()
+
+    def prefix_keys(self, genome):
+        keys = {}
+        key = 0
+        for end in range(self.interval, len(genome), self.interval):
+            key = hash((key, tuple(genome[end - self.interval:end])))
+            keys[end] = key
+        return keys
+
+    def resume(self, builder):
+        genome = builder.individual
+        keys = self.prefix_keys(genome)
+        for end in sorted(keys, reverse=True):
+            entry = self._entries.get(keys[end])
+            if entry is None:
+                continue
+            owner, state = entry
+            if owner[:end] != tuple(genome[:end]):
+                continue
+            self._entries.move_to_end(keys[end])
+            builder.restore(state)
+            return end, keys
+        return 0, keys
+
+    def save(self, key, builder):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = (tuple(builder.individual), builder.snapshot())
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,8 +1,7 @@
-import openpyxl
-from openpyxl.utils import coordinate_to_tuple
+import time
+
 from config import *
 from data_base import DataBase
-import excel_parser as ep
 from teacher import Teacher
 from subject import Subject
 from school_class import SchoolClass
@@ -25,102 +24,147 @@ CHAR_TO_SLOT = {
 }
 
 
-def parse_preferences(db: DataBase):
-    wb = openpyxl.load_workbook(preferences_filename, data_only=True)
-    _parse_teachers_prefs(wb["teachers"], db)
-    _parse_subjects_prefs(wb["subjects"], db)
-    slots_matrix = _parse_slots_structure(wb["slots"], db)
+TRUE_VALUES = ['+', '1', 'true', 'yes']
+
+# Заголовки стовпців (починаючи з B) аркушів налаштувань, які читає парсер;
+# max_per_day, як і раніше, читається зі стовпця max_stack
+TEACHER_COLUMNS = ("offline", "travel_time", "wants_gaps", "max_online_lessons_from_underground")
+SUBJECT_COLUMNS = ("offline_prioriry", "difficulty", "preferred_stack", "max_stack")
+
+
+def parse_preferences(db: DataBase, filename=preferences_filename):
+    # openpyxl імпортується тут: константи SLOT_* з цього модуля потрібні
+    # будівнику розкладу, якому сама бібліотека не потрібна
+    import openpyxl
+    wb = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+    try:
+        _timed("teachers", _parse_teachers_prefs, wb["teachers"], db)
+        _timed("subjects", _parse_subjects_prefs, wb["subjects"], db)
+        slots_matrix = _timed("slots", _parse_slots_structure, wb["slots"], db)
+    finally:
+        wb.close()
     return slots_matrix
 
 
+def _timed(sheet_name, parse, ws, db):
+    started = time.perf_counter()
+    result = parse(ws, db)
+    print(f"Parsed sheet '{sheet_name}' in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return result
+
+
+def _cell(row, column):
+    # Рядки read-only аркуша можуть бути коротшими за найширший рядок
+    return row[column - 1] if column <= len(row) else None
+
+
+def _check_header(ws, header, expected):
+    # Назви порівнюються без урахування регістру; про всі невідповідності
+    # аркуша повідомляється одним рядком
+    mismatches = []
+    for column, name in enumerate(expected, start=2):
+        value = _cell(header, column)
+        if value is None or str(value).strip().lower() != name.lower():
+            mismatches.append(f"column {column}: expected '{name}', found '{value}'")
+    if mismatches:
+        print(f"Warning: sheet '{ws.title}' has unexpected headers ({'; '.join(mismatches)}).")
+
+
+def _int_value(ws, row_idx, column, value):
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"Sheet '{ws.title}', row {row_idx}, column {column}: expected an integer, got '{value}'."
+        ) from None
+
+
 def _parse_teachers_prefs(ws, db):
-    for row in range(2, ws.max_row + 1):
-        name = ws.cell(row=row, column=1).value
+    rows = ws.iter_rows(values_only=True)
+    _check_header(ws, next(rows, ()), TEACHER_COLUMNS)
+    for row_idx, row in enumerate(rows, start=2):
+        name = _cell(row, 1)
         if not name: continue
         teacher_obj = db.teacher_dict.get(name)
         if teacher_obj:
-            can_offline_val = ws.cell(row=row, column=2).value
-            teacher_obj.can_offline = (str(can_offline_val).lower() in ['+', '1', 'true', 'yes'])
-
-            travel_val = ws.cell(row=row, column=3).value
-            teacher_obj.travel_time = int(travel_val) if travel_val else 0
-
-            wants_windows = ws.cell(row=row, column=4).value
-            teacher_obj.wants_windows = (str(wants_windows).lower() in ['+', '1', 'true', 'yes'])
-
-            max_stack = ws.cell(row=row, column=5).value
-            teacher_obj.max_online_lessons_from_underground = int(max_stack) if max_stack else 0
+            teacher_obj.can_offline = (str(_cell(row, 2)).lower() in TRUE_VALUES)
+            teacher_obj.travel_time = _int_value(ws, row_idx, 3, _cell(row, 3))
+            teacher_obj.wants_windows = (str(_cell(row, 4)).lower() in TRUE_VALUES)
+            teacher_obj.max_online_lessons_from_underground = _int_value(ws, row_idx, 5, _cell(row, 5))
 
 
 def _parse_subjects_prefs(ws, db):
-    for row in range(2, ws.max_row + 1):
-        name = ws.cell(row=row, column=1).value
+    rows = ws.iter_rows(values_only=True)
+    _check_header(ws, next(rows, ()), SUBJECT_COLUMNS)
+    for row_idx, row in enumerate(rows, start=2):
+        name = _cell(row, 1)
         if not name: continue
 
         subject_obj = db.subject_dict.get(name)
         if subject_obj:
-            prio_val = ws.cell(row=row, column=2).value
-            subject_obj.priority_offline = (str(prio_val).lower() in ['+', '1', 'true', 'yes'])
-
-            difficulty = ws.cell(row=row, column=3).value
-            subject_obj.difficulty = int(difficulty) if difficulty else 0
+            subject_obj.priority_offline = (str(_cell(row, 2)).lower() in TRUE_VALUES)
+            subject_obj.difficulty = _int_value(ws, row_idx, 3, _cell(row, 3))
+            subject_obj.preferred_stack = _int_value(ws, row_idx, 4, _cell(row, 4))
+            subject_obj.max_stack = _int_value(ws, row_idx, 5, _cell(row, 5))
+            # як і раніше, max_per_day читається з того ж стовпця, що й max_stack
+            subject_obj.max_per_day = _int_value(ws, row_idx, 5, _cell(row, 5))
 
-            preferred_stack = ws.cell(row=row, column=4).value
-            subject_obj.preferred_stack = int(preferred_stack) if preferred_stack else 0
-
-            max_stack = ws.cell(row=row, column=5).value
-            subject_obj.max_stack = int(max_stack) if max_stack else 0
-
-            max_per_day = ws.cell(row=row, column=5).value
-            subject_obj.max_per_day = int(max_per_day) if max_per_day else 0
 
 def _parse_slots_structure(ws, db):
+    from openpyxl.utils import coordinate_to_tuple
     ref_row, ref_col = coordinate_to_tuple(top_left_cell_of_day_templates)
+    pattern_rows = range(ref_row + 1, ref_row + number_of_day_templates + 1)
     patterns = {}
+    class_rows = []
+    classes_ended = False
+
+    # Шаблони днів і розподіл шаблонів за класами лежать на одному аркуші,
+    # тому за один прохід збираємо обидва, а зв'язуємо їх після нього
+    for row_idx, row in enumerate(ws.iter_rows(values_only=True), start=1):
+        if row_idx in pattern_rows:
+            pat_types = []
+            for slot_idx in range(lessons_available_per_day):
+                char_code = _cell(row, ref_col + 1 + slot_idx)
+                char_str = str(char_code).upper() if char_code is not None else "-"
+                pat_types.append(CHAR_TO_SLOT.get(char_str, SLOT_EMPTY))
+            patterns[row_idx - ref_row] = tuple(pat_types)
+        if row_idx >= 2 and not classes_ended:
+            class_name = _cell(row, 1)
+            if not class_name:
+                classes_ended = True
+            else:
+                class_rows.append((class_name, [_cell(row, 2 + day_idx) for day_idx in range(7)]))
 
-    for i in range(1, number_of_day_templates + 1):
-        pat_row = ref_row + i
-        pat_types = []
-        for slot_idx in range(lessons_available_per_day):
-            col_idx = ref_col + 1 + slot_idx
-            char_code = ws.cell(row=pat_row, column=col_idx).value
-            char_str = str(char_code).upper() if char_code is not None else "-"
-            slot_type = CHAR_TO_SLOT.get(char_str, SLOT_EMPTY)
-            pat_types.append(slot_type)
-        patterns[i] = pat_types
+    empty_day = (SLOT_EMPTY,) * lessons_available_per_day
     class_slots = {}
-
-    for row in range(2, ws.max_row + 1):
-        class_name = ws.cell(row=row, column=1).value
-        if not class_name: break
-
+    for class_name, day_values in class_rows:
         c_obj = db.school_class_dict.get(class_name)
         if not c_obj: continue
 
         class_slots[c_obj.id] = []
-        for day_idx in range(7):
-            col = 2 + day_idx
-            val = ws.cell(row=row, column=col).value
+        for day_idx, val in enumerate(day_values):
             is_empty_day = (val is None) or (str(val).strip() in ["0", "-", ""])
             if is_empty_day:
-                class_slots[c_obj.id].append([SLOT_EMPTY] * lessons_available_per_day)
+                class_slots[c_obj.id].append(empty_day)
             elif val in patterns:
                 class_slots[c_obj.id].append(patterns[val])
             else:
                 print(f"Warning: Unknown pattern '{val}' for class {class_name} at day {day_idx + 1}. Setting as empty.")
-                class_slots[c_obj.id].append([SLOT_EMPTY] * lessons_available_per_day)
+                class_slots[c_obj.id].append(empty_day)
 
     return class_slots
 
 
 
 if __name__ == "__main__":
+    import excel_parser as ep
     db = DataBase()
     Teacher.reset_registry()
     Subject.reset_registry()
     SchoolClass.reset_registry()
-    wb_h = openpyxl.load_workbook(hours_filename, data_only=True)
-    ep.process_table(wb_h.active, db)
+    ep.load_hours(hours_filename, db)
 
     print(f"Loaded {len(db.teacher_dict)} teachers.")
     try:
@@ -0,0 +1,60 @@
+from collections import defaultdict
+
+import numpy as np
+
+# Інкрементне перепланування: уроки нової задачі зіставляються з уроками
+# задачі, для якої збережено фронт Парето, і перестановки фронту
+# переводяться на нові id. Незмінні уроки лишаються на своїх місцях у
+# перестановці, тож жадібний декодер здебільшого ставить їх у ті самі слоти;
+# нові уроки додаються в кінець і займають слоти, що лишилися вільними.
+
+
+def lesson_keys(db):
+    # Опис кожного уроку, що не залежить від id: (клас, предмет, вчитель, мигаючий)
+    classes = {c.id: c.name for c in db.school_class_dict.values()}
+    subjects = {s.id: s.name for s in db.subject_dict.values()}
+    teachers = {t.id: t.name for t in db.teacher_dict.values()}
+    return [(classes[l.school_class_id], subjects[l.subject_id], teachers[l.teacher_id], bool(l.is_blinking))
+            for l in db.lesson_list]
+
+
+def match_lessons(old_lessons, new_lessons):
+    # Повертає (id_map, added, removed, reassigned): id_map[old_id] = new_id.
+    # Спершу уроки зіставляються повністю, потім без вчителя - урок того ж
+    # класу і предмета, який тепер веде інший вчитель, зберігає своє місце.
+    old_lessons = [tuple(key) for key in old_lessons]
+    new_lessons = [tuple(key) for key in new_lessons]
+    id_map = {}
+    reassigned = 0
+    for relaxed in (False, True):
+        key_of = (lambda key: (key[0], key[1], key[3])) if relaxed else (lambda key: key)
+        free = defaultdict(list)
+        used = set(id_map.values())
+        for new_id in reversed(range(len(new_lessons))):
+            if new_id not in used:
+                free[key_of(new_lessons[new_id])].append(new_id)
+        for old_id, key in enumerate(old_lessons):
+            if old_id in id_map:
+                continue
+            candidates = free.get(key_of(key))
+            if candidates:
+                id_map[old_id] = candidates.pop()
+                reassigned += relaxed
+    matched = set(id_map.values())
+    added = [new_id for new_id in range(len(new_lessons)) if new_id not in matched]
+    removed = [old_id for old_id in range(len(old_lessons)) if old_id not in id_map]
+    return id_map, added, removed, reassigned
+
+
+def map_genome(genome, id_map, added):
+    return [id_map[old_id] for old_id in genome if old_id in id_map] + added
+
+
+def moved_lessons(phenotype, previous_phenotypes, id_map):
+    # Найменша серед попередніх розкладів кількість уроків, що змінили
+    # день чи номер уроку (нові уроки не враховуються)
+    old_ids = np.fromiter(id_map.keys(), dtype=np.int64, count=len(id_map))
+    new_ids = np.fromiter(id_map.values(), dtype=np.int64, count=len(id_map))
+    positions = np.asarray(phenotype.lesson_position)[new_ids]
+    return min(int(np.count_nonzero(np.asarray(previous.lesson_position)[old_ids] != positions))
+               for previous in previous_phenotypes)
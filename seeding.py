@@ -0,0 +1,96 @@
+import random
+
+import numpy as np
+from deap import creator
+
+import parameters as P
+
+# Початкова популяція. Крім випадкових перестановок, частина особин може
+# бути впорядкована за обмеженістю уроків: жадібний декодер розставляє уроки
+# в порядку генів, тож уроки з найменшим вибором слотів, поставлені першими,
+# рідше лишаються нерозміщеними. Ще одна частина може братися зі збереженого
+# фронту Парето попереднього запуску.
+
+STRATEGIES = ("random", "teacher", "class")
+
+
+def _normalized_rank(values):
+    # 0 - найменш обмежений, 1 - найбільш; однакові значення мають однаковий ранг
+    unique, rank = np.unique(values, return_inverse=True)
+    return rank / max(len(unique) - 1, 1)
+
+
+def lesson_scores(instance):
+    # Обмеженість кожного уроку за вчителем і за класом, від 0 до 1
+    tables = instance.lookup
+    lesson_class = np.asarray(tables.lesson_class)
+    lesson_teacher = np.asarray(tables.lesson_teacher)
+
+    # вчитель: без очних уроків (лише O-слоти), потім довший переїзд, потім більше уроків
+    teacher_load = np.bincount(lesson_teacher, minlength=instance.n_teachers)
+    teacher_key = (~np.asarray(tables.teacher_can_offline) * 1_000_000
+                   + np.asarray(tables.teacher_travel_time) * 1_000 + teacher_load)
+    # клас: найменше вільних придатних слотів після розстановки всіх його уроків
+    class_load = np.bincount(lesson_class, minlength=instance.n_classes)
+    class_slots = np.array([len(instance.candidates.preferred[c_id]) + len(instance.candidates.compromise[c_id])
+                            for c_id in range(instance.n_classes)])
+    class_key = class_load - class_slots
+    return {
+        "teacher": _normalized_rank(teacher_key)[lesson_teacher],
+        "class": _normalized_rank(class_key)[lesson_class],
+    }
+
+
+def constrained_genome(scores, noise):
+    # Уроки в порядку спадання обмеженості; шум перемішує близькі за
+    # обмеженістю уроки, щоб особини відрізнялися
+    keys = [(-score - random.random() * noise, l_id) for l_id, score in enumerate(scores.tolist())]
+    keys.sort()
+    return [l_id for _, l_id in keys]
+
+
+def _counts(mix, n):
+    total = sum(mix.values())
+    counts = {name: int(n * share / total) for name, share in mix.items()}
+    # залишок від округлення - стратегії з найбільшою часткою
+    counts[max(mix, key=mix.get)] += n - sum(counts.values())
+    return counts
+
+
+def _warm_genomes(front, toolbox, n_lessons, count):
+    valid = []
+    for ind in front:
+        if len(ind) == n_lessons and sorted(ind) == list(range(n_lessons)) and list(ind) not in valid:
+            valid.append(list(ind))
+    if len(valid) < len(front):
+        print(f"Warm start: {len(front) - len(valid)} of {len(front)} saved solutions do not fit this problem.")
+    if not valid:
+        return []
+    genomes = valid[:count]
+    # решта місць - мутовані копії збережених розв'язків
+    while len(genomes) < count:
+        mutant, = toolbox.mutate(creator.Individual(random.choice(valid)))
+        genomes.append(list(mutant))
+    return genomes
+
+
+def initial_population(toolbox, instance, n, mix=P.SEEDING_MIX, noise=P.SEEDING_NOISE,
+                       warm_front=None, warm_share=P.WARM_START_SHARE):
+    # warm_front - особини збереженого фронту (ga.load_front)
+    unknown = set(mix) - set(STRATEGIES)
+    if unknown:
+        raise ValueError(f"Unknown seeding strategy '{sorted(unknown)[0]}'. Available: {', '.join(STRATEGIES)}.")
+    population = []
+    if warm_front:
+        warm = _warm_genomes(warm_front, toolbox, instance.n_lessons, int(round(n * warm_share)))
+        population.extend(creator.Individual(genome) for genome in warm)
+        print(f"Warm start: {len(warm)} individuals from the saved front.")
+    counts = _counts(mix, n - len(population))
+    scores = lesson_scores(instance) if any(counts.get(name) for name in ("teacher", "class")) else None
+    for name in STRATEGIES:
+        count = counts.get(name, 0)
+        if name == "random":
+            population.extend(toolbox.population(n=count))
+        else:
+            population.extend(creator.Individual(constrained_genome(scores[name], noise)) for _ in range(count))
+    return population
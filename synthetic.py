@@ -0,0 +1,136 @@
+import math
+import random
+
+from config import lessons_available_per_day, number_of_day_templates
+from data_base import DataBase
+from teacher import Teacher
+from subject import Subject
+from school_class import SchoolClass
+from lesson import Lesson
+from instance import compile_instance
+from prepare import SLOT_EMPTY, SLOT_ONLINE, SLOT_OFFLINE, SLOT_TRAVEL, SLOT_UNWANTED
+
+# Синтетичні задачі для вимірювання швидкодії: DataBase і slots_structure
+# будуються напряму, без xlsx-таблиць. Та сама комбінація параметрів і seed
+# завжди дає ту саму задачу.
+
+LETTERS = "АБВГДЕЖЗІКЛМНОПРСТУФХЦЧШЩЮЯ"
+SCHOOL_DAYS = 5
+TEACHER_CAN_OFFLINE_SHARE = 0.8
+TEACHER_WANTS_WINDOWS_SHARE = 0.1
+
+
+def _letters(index, width=2):
+    while index >= len(LETTERS) ** width:
+        width += 1
+    code = ""
+    for _ in range(width):
+        index, digit = divmod(index, len(LETTERS))
+        code = LETTERS[digit] + code
+    return code
+
+
+def _teacher_name(index):
+    # ім'я має відповідати шаблону Teacher.name_pattern
+    code = _letters(index)
+    return f"Вчитель-{code.capitalize()} {code[0]}.{code[1]}."
+
+
+def _reset_registries():
+    Teacher.reset_registry()
+    Subject.reset_registry()
+    SchoolClass.reset_registry()
+    Lesson.reset_registry()
+
+
+def generate_day_templates(rng, n_templates, lessons_per_day, offline_share):
+    # Шаблон дня як у preferences.xlsx: очні уроки (U), переїзд (T),
+    # дистанційні уроки (O) і два небажані слоти (W) наприкінці дня
+    templates = []
+    for _ in range(n_templates):
+        start = rng.randint(0, 1)
+        length = min(rng.randint(lessons_per_day, lessons_per_day + 2), lessons_available_per_day - start - 4)
+        offline = sum(rng.random() < offline_share for _ in range(length))
+        online = length - offline
+        travel = rng.randint(1, 2) if offline and online else 0
+        day = ([SLOT_EMPTY] * start + [SLOT_OFFLINE] * offline + [SLOT_TRAVEL] * travel
+               + [SLOT_ONLINE] * online + [SLOT_UNWANTED] * 2)
+        day += [SLOT_EMPTY] * (lessons_available_per_day - len(day))
+        templates.append(tuple(day))
+    return templates
+
+
+def generate_problem(n_classes=24, n_teachers=48, n_subjects=29, lessons_per_class=34,
+                     n_day_templates=number_of_day_templates, offline_share=0.5,
+                     blinking_share=0.0, seed=0):
+    # Повертає (db, slots_structure, instance), як і instance_cache.load_problem
+    if min(n_classes, n_teachers, n_subjects, lessons_per_class, n_day_templates) < 1:
+        raise ValueError("Synthetic problem needs at least one class, teacher, subject, lesson and day template.")
+    lessons_per_day = math.ceil(lessons_per_class / SCHOOL_DAYS)
+    if lessons_per_day + 5 > lessons_available_per_day:
+        raise ValueError(f"{lessons_per_class} lessons per class do not fit into {SCHOOL_DAYS} school days.")
+    rng = random.Random(seed)
+    _reset_registries()
+    db = DataBase()
+
+    for c_idx in range(n_classes):
+        # паралелі 5-11 класів: 5-А, 6-А, ..., 11-А, 5-Б, ...
+        parallel, grade = divmod(c_idx, 7)
+        name = f"{5 + grade}-{LETTERS[parallel % len(LETTERS)]}"
+        if parallel >= len(LETTERS):
+            name += str(parallel // len(LETTERS))
+        db.school_class_dict[name] = SchoolClass(name)
+
+    subjects = []
+    for s_idx in range(n_subjects):
+        subject = Subject(f"Предмет {s_idx + 1}")
+        subject.priority_offline = rng.random() < offline_share
+        subject.difficulty = rng.randint(2, 9)
+        subject.max_stack = rng.randint(1, 2)
+        subject.preferred_stack = rng.randint(1, subject.max_stack)
+        subject.max_per_day = rng.randint(1, 3)
+        db.subject_dict[subject.name] = subject
+        subjects.append(subject)
+
+    teachers = []
+    for t_idx in range(n_teachers):
+        teacher = Teacher(_teacher_name(t_idx))
+        teacher.can_offline = rng.random() < TEACHER_CAN_OFFLINE_SHARE
+        teacher.travel_time = rng.randint(1, 2) if teacher.can_offline else 0
+        teacher.wants_windows = rng.random() < TEACHER_WANTS_WINDOWS_SHARE
+        teacher.max_online_lessons_from_underground = rng.randint(1, 2)
+        db.teacher_dict[teacher.name] = teacher
+        teachers.append(teacher)
+
+    # кожен предмет веде хоча б один вчитель, кожен вчитель - хоча б один предмет
+    subject_teachers = [[] for _ in subjects]
+    for idx in range(max(n_subjects, n_teachers)):
+        subject_teachers[idx % n_subjects].append(teachers[idx % n_teachers])
+
+    # години предметів у кожному класі; важливіші предмети мають більше годин
+    weights = [rng.randint(1, 4) for _ in subjects]
+    hours = {}
+    for school_class in db.school_class_dict.values():
+        # вчитель класу з предмета один, як і в таблиці годин
+        class_teachers = {}
+        for subject in rng.choices(subjects, weights, k=lessons_per_class):
+            if subject.id not in class_teachers:
+                class_teachers[subject.id] = rng.choice(subject_teachers[subject.id]).id
+            key = (subject.id, class_teachers[subject.id], school_class.id)
+            hours[key] = hours.get(key, 0) + 1
+
+    # порядок уроків - як у таблиці годин: предмет, вчитель, клас
+    for (s_id, t_id, c_id), count in sorted(hours.items()):
+        for _ in range(count):
+            db.lesson_list.append(Lesson(c_id, s_id, t_id))
+        if rng.random() < blinking_share:
+            db.lesson_list.append(Lesson(c_id, s_id, t_id, is_blinking=True))
+
+    templates = generate_day_templates(rng, n_day_templates, lessons_per_day, offline_share)
+    empty_day = (SLOT_EMPTY,) * lessons_available_per_day
+    slots_structure = {}
+    for school_class in db.school_class_dict.values():
+        days = [rng.choice(templates) for _ in range(SCHOOL_DAYS)]
+        slots_structure[school_class.id] = days + [empty_day] * (7 - SCHOOL_DAYS)
+
+    return db, slots_structure, compile_instance(db, slots_structure)
@@ -0,0 +1,63 @@
+import csv
+import json
+from pathlib import Path
+
+from config import lessons_available_per_day
+from prepare import SLOT_ONLINE, SLOT_OFFLINE, SLOT_UNWANTED
+from phenotype import phenotype_of
+
+# Розклади всього фронту Парето однією плоскою таблицею: рядок на кожен
+# розміщений урок. Рядки беруться прямо з масивів розкладу (Phenotype),
+# без проміжних подань за класами і вчителями, і одразу пишуться у файл.
+
+COLUMNS = ("solution", "class", "teacher", "subject", "day", "slot", "location", "slot_type", "blinking")
+# ті самі позначення, що й у шаблонах днів preferences.xlsx
+SLOT_TYPE_NAMES = {SLOT_ONLINE: "O", SLOT_OFFLINE: "U", SLOT_UNWANTED: "W"}
+FORMATS = (".csv", ".jsonl")
+
+
+def _names(objects):
+    names = [None] * (max((obj.id for obj in objects), default=-1) + 1)
+    for obj in objects:
+        names[obj.id] = obj.name
+    return names
+
+
+def lesson_rows(solution_id, phenotype, instance, names):
+    # Генератор рядків COLUMNS для одного розв'язку, у порядку id уроків
+    class_names, teacher_names, subject_names = names
+    tables = instance.lookup
+    for l_id, pos in enumerate(phenotype.lesson_position):
+        if pos == -1:
+            continue
+        c_id = tables.lesson_class[l_id]
+        t_id = tables.lesson_teacher[l_id]
+        day, slot = divmod(pos, lessons_available_per_day)
+        at_school = (phenotype.teacher_day_school[t_id * 7 + day] >> slot) & 1
+        yield (solution_id, class_names[c_id], teacher_names[t_id], subject_names[tables.lesson_subject[l_id]],
+               day, slot, "SCHOOL" if at_school else "HOME",
+               SLOT_TYPE_NAMES.get(tables.slot_types[c_id][day][slot]), tables.lesson_blinking[l_id])
+
+
+def save_front_table(pareto_front, db, instance, filename):
+    # Формат визначається розширенням файлу: .csv або .jsonl. Номер розв'язку
+    # збігається з номером "Solution N" у підсумку еволюції
+    suffix = Path(filename).suffix.lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Unknown table format '{suffix}'. Available: {', '.join(FORMATS)}.")
+    names = (_names(db.school_class_dict.values()), _names(db.teacher_dict.values()), _names(db.subject_dict.values()))
+    Path(filename).parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        if suffix == ".csv":
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            write = writer.writerow
+        else:
+            def write(row):
+                f.write(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + "\n")
+        for solution_id, ind in enumerate(pareto_front, start=1):
+            for row in lesson_rows(solution_id, phenotype_of(ind, instance), instance, names):
+                write(row)
+                rows += 1
+    print(f"Schedule table saved to {filename}: {rows} lessons of {len(pareto_front)} solutions.")
@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+
+import parameters as P
+from hypervolume import hypervolume
+
+
+class Termination:
+    # Дострокова зупинка еволюції: за бюджетом часу або коли гіпероб'єм
+    # фронту Парето STAGNATION_GENERATIONS поколінь не зростає більше ніж
+    # на STAGNATION_TOLERANCE (відносно найкращого значення). Гіпероб'єм
+    # рахується щопоколінця і записується в журнал незалежно від умов зупинки.
+    def __init__(self, time_budget=P.TIME_BUDGET, stagnation_generations=P.STAGNATION_GENERATIONS,
+                 tolerance=P.STAGNATION_TOLERANCE, reference=P.HV_REFERENCE):
+        self.time_budget = time_budget
+        self.stagnation_generations = stagnation_generations
+        self.tolerance = tolerance
+        self.reference = None if reference is None else [float(value) for value in reference]
+        self.best_hv = 0.0
+        self.best_gen = 0
+        self.reason = None
+        self.started = time.perf_counter()
+        self._last_check = None
+
+    def update(self, gen, front):
+        # Повертає гіпероб'єм фронту покоління gen
+        points = np.array([ind.fitness.values for ind in front], dtype=np.float64).reshape(-1, 3)
+        if self.reference is None:
+            # опорна точка фіксується за першим фронтом, щоб значення
+            # різних поколінь були порівнянні
+            self.reference = (points.max(axis=0) * 1.1 + 1).tolist()
+        hv = hypervolume(points, self.reference)
+        if hv > self.best_hv * (1 + self.tolerance):
+            self.best_hv = hv
+            self.best_gen = gen
+        return hv
+
+    def start_generations(self):
+        # тривалість поколінь вимірюється від кінця покоління 0, щоб
+        # створення й оцінка початкової популяції не потрапили в прогноз
+        self._last_check = time.perf_counter()
+
+    def should_stop(self, gen):
+        now = time.perf_counter()
+        # без виміряного покоління прогнозу немає
+        generation_time = 0.0 if self._last_check is None else now - self._last_check
+        self._last_check = now
+        if self.stagnation_generations > 0 and gen - self.best_gen >= self.stagnation_generations:
+            self.reason = f"no hypervolume gain for {gen - self.best_gen} generations"
+            return True
+        if self.time_budget > 0:
+            elapsed = now - self.started
+            # зупиняємось, якщо ще одне таке саме покоління не вміститься в бюджет
+            if elapsed + generation_time > self.time_budget:
+                self.reason = f"time budget of {self.time_budget:g} s reached after {elapsed:.1f} s"
+                return True
+        return False
+
+    # стан для контрольної точки; час рахується заново в кожному запуску
+    def get_state(self):
+        return {"reference": self.reference, "best_hv": self.best_hv, "best_gen": self.best_gen}
+
+    def set_state(self, state):
+        self.reference = state["reference"]
+        self.best_hv = state["best_hv"]
+        self.best_gen = state["best_gen"]